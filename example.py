@@ -1,172 +1,200 @@
+import sys
+from functools import lru_cache
 import numpy as np
-from tcas import EnhancedTCAS
+from tcas import EnhancedTCAS, RiskLevel, WeatherRiskResult
 
-def create_sample_data():
-    """Create sample data for testing."""
-    # Sample transponder data
-    ownship_transponder = {
-        'position': {'x': 0, 'y': 0, 'z': 10000},
-        'altitude': 10000,
-        'speed': 250,
-        'heading': 90,
-        'flight_level': 330,
-        'speed_category': 'HIGH',
-        'heading_cardinal': 'EAST'
-    }
+# Random generator for simulated visual data
+_rng = np.random.default_rng()
 
-    
-    
-    intruder_transponder = {
-        'position': {'x': 5000, 'y': 5000, 'z': 9500},
-        'altitude': 9500,
-        'speed': 220,
-        'heading': 270,
-        'flight_level': 310,
-        'speed_category': 'MEDIUM',
-        'heading_cardinal': 'WEST'
-    }
-    
-    # Sample radar data
-    ownship_radar = {
-        'relative_velocity': {'x': 0, 'y': 0, 'z': 0},
-        'target_size': {'length': 30, 'width': 30, 'height': 10},
-        'closing_rate': 0,
-        'aspect_angle': 0
-    }
-    
-    intruder_radar = {
-        'relative_velocity': {'x': -220, 'y': 0, 'z': -100},
-        'target_size': {'length': 25, 'width': 25, 'height': 8},
-        'closing_rate': 250,
-        'aspect_angle': 45
-    }
-    
+# Sample transponder data
+_OWNSHIP_TRANSPONDER = {
+    'position': {'lat': 0, 'lon': 0},
+    'altitude': 10000,
+    'speed': 250,
+    'heading': 90,
+    'flight_level': 330,
+    'speed_category': 'HIGH',
+    'heading_cardinal': 'EAST'
+}
+
+_INTRUDER_TRANSPONDER = {
+    'position': {'lat': 5000, 'lon': 5000},
+    'altitude': 9500,
+    'speed': 220,
+    'heading': 270,
+    'flight_level': 310,
+    'speed_category': 'MEDIUM',
+    'heading_cardinal': 'WEST'
+}
+
+# Sample radar data
+_OWNSHIP_RADAR = {
+    'relative_velocity': {'x': 0, 'y': 0, 'z': 0},
+    'target_size': {'length': 30, 'width': 30, 'height': 10},
+    'closing_rate': 0,
+    'aspect_angle': 0
+}
+
+_INTRUDER_RADAR = {
+    'relative_velocity': {'x': -220, 'y': 0, 'z': -100},
+    'target_size': {'length': 25, 'width': 25, 'height': 8},
+    'closing_rate': 250,
+    'aspect_angle': 45
+}
+
+# Sample weather data
+_WEATHER = {
+    'visibility': 5000,
+    'precipitation_rate': 2.5,
+    'cloud_ceiling': 8000,
+    'wind_speed': 25,
+    'wind_direction': 45,
+    'turbulence_index': 0.7,
+    'icing_potential': 0.6,
+    'lightning_activity': 0.8
+}
+
+# Sample terrain data
+_TERRAIN = {
+    'aircraft_altitude': 10000,
+    'terrain_elevation': 8000,
+    'terrain_slope': 15,
+    'distance_to_terrain': 2000,
+    'terrain_type': 'mountainous',
+    'terrain_roughness': 0.8,
+    'terrain_obstacles': [
+        {'type': 'peak', 'elevation': 8500, 'height': 500, 'distance': 5000},
+        {'type': 'ridge', 'elevation': 8200, 'height': 200, 'distance': 3000}
+    ],
+    'terrain_clearance': 2000
+}
+
+_SAMPLE_TIMESTAMP = '2024-03-20T10:00:00Z'
+
+def create_sample_data():
+    """Create sample data for testing. Only the visual data is regenerated per call."""
     # Sample visual data (simulated image features)
-    ownship_visual = np.random.rand(224, 224, 3)
-    intruder_visual = np.random.rand(224, 224, 3)
-    
-    # Sample weather data
-    weather_data = {
-        'visibility': 5000,
-        'precipitation_rate': 2.5,
-        'cloud_ceiling': 8000,
-        'wind_speed': 25,
-        'wind_direction': 45,
-        'turbulence_index': 0.7,
-        'icing_potential': 0.6,
-        'lightning_activity': 0.8
-    }
-    
-    # Sample terrain data
-    terrain_data = {
-        'aircraft_altitude': 10000,
-        'terrain_elevation': 8000,
-        'terrain_slope': 15,
-        'distance_to_terrain': 2000,
-        'terrain_type': 'mountainous',
-        'terrain_roughness': 0.8,
-        'terrain_obstacles': [
-            {'type': 'peak', 'elevation': 8500, 'distance': 5000},
-            {'type': 'ridge', 'elevation': 8200, 'distance': 3000}
-        ],
-        'terrain_clearance': 2000
-    }
+    ownship_visual = _rng.integers(0, 256, (224, 224, 3), dtype=np.uint8)
+    intruder_visual = _rng.integers(0, 256, (224, 224, 3), dtype=np.uint8)
     
     return {
         'ownship': {
-            'transponder': ownship_transponder,
-            'radar': ownship_radar,
+            'transponder': _OWNSHIP_TRANSPONDER,
+            'radar': _OWNSHIP_RADAR,
             'visual': ownship_visual,
-            'timestamp': '2024-03-20T10:00:00Z'
+            'timestamp': _SAMPLE_TIMESTAMP
         },
         'intruder': {
-            'transponder': intruder_transponder,
-            'radar': intruder_radar,
+            'transponder': _INTRUDER_TRANSPONDER,
+            'radar': _INTRUDER_RADAR,
             'visual': intruder_visual,
-            'timestamp': '2024-03-20T10:00:00Z'
+            'timestamp': _SAMPLE_TIMESTAMP
         },
-        'weather': weather_data,
-        'terrain': terrain_data
+        'weather': _WEATHER,
+        'terrain': _TERRAIN
     }
 
+@lru_cache(maxsize=None)
+def _level_name(level: int) -> str:
+    """Human-readable name of a risk level."""
+    return sys.intern(RiskLevel(level).name)
+
 def print_detailed_object_info(obj_info: dict, prefix: str = ""):
     """Print detailed information about detected objects."""
-    print(f"\n{prefix}Object Information:")
-    print(f"Type: {obj_info['basic_info']['type']}")
-    print(f"Confidence: {obj_info['basic_info']['confidence']:.2f}")
-    print(f"Position: {obj_info['basic_info']['position']}")
-    print(f"Altitude: {obj_info['basic_info']['altitude']} ft")
-    print(f"Speed: {obj_info['basic_info']['speed']} knots")
-    print(f"Heading: {obj_info['basic_info']['heading']}°")
-    
-    print("\nDetailed Classification:")
+    lines = [
+        f"\n{prefix}Object Information:",
+        f"Type: {obj_info['basic_info']['type']}",
+        f"Confidence: {obj_info['basic_info']['confidence']:.2f}",
+        f"Position: {obj_info['basic_info']['position']}",
+        f"Altitude: {obj_info['basic_info']['altitude']} ft",
+        f"Speed: {obj_info['basic_info']['speed']} knots",
+        f"Heading: {obj_info['basic_info']['heading']}°"
+    ]
+    
+    lines.append("\nDetailed Classification:")
     for category, details in obj_info['detailed_classification'].items():
-        print(f"- {category}: {details}")
+        lines.append(f"- {category}: {details}")
     
-    print("\nPossible Types:")
+    lines.append("\nPossible Types:")
     for type_info in obj_info['possible_types']:
-        print(f"- {type_info['type']} ({type_info['confidence']:.2f})")
+        lines.append(f"- {type_info['type']} ({type_info['confidence']:.2f})")
     
-    print("\nAdditional Features:")
+    lines.append("\nAdditional Features:")
     for feature, value in obj_info['additional_features'].items():
-        print(f"- {feature}: {value}")
+        lines.append(f"- {feature}: {value}")
+    
+    sys.stdout.write("\n".join(lines) + "\n")
 
 def print_risk_assessment(risk_assessment: dict):
     """Print risk assessment information."""
-    print("\nRisk Assessment:")
-    print(f"Risk Level: {risk_assessment['risk_level']}")
-    print(f"Risk Score: {risk_assessment['risk_score']:.2f}")
-    print(f"Time to Collision: {risk_assessment['time_to_collision']:.1f} seconds")
-    print(f"Minimum Separation Required: {risk_assessment['min_separation']:.1f} meters")
-    
-    print("\nRisk Factors:")
+    lines = [
+        "\nRisk Assessment:",
+        f"Risk Level: {_level_name(risk_assessment['risk_level'])}",
+        f"Confidence: {risk_assessment['confidence']:.2f}",
+        f"Time to Closest Approach: {risk_assessment['time_to_closest']:.1f} seconds",
+        f"Minimum Separation: {risk_assessment['min_separation']:.1f} meters"
+    ]
+    
+    lines.append("\nRisk Factors:")
     for factor, value in risk_assessment['risk_factors'].items():
-        print(f"- {factor}: {value:.2f}")
+        lines.append(f"- {factor}: {value:.2f}")
+    
+    sys.stdout.write("\n".join(lines) + "\n")
 
-def print_weather_assessment(weather_assessment: dict):
+def print_weather_assessment(weather_assessment: WeatherRiskResult):
     """Print weather assessment information."""
-    print("\nWeather Assessment:")
-    print(f"Risk Level: {weather_assessment['risk_level']}")
-    print(f"Risk Score: {weather_assessment['risk_score']:.2f}")
+    lines = [
+        "\nWeather Assessment:",
+        f"Risk Level: {_level_name(weather_assessment.risk_level)}",
+        f"Risk Score: {weather_assessment.risk_score:.2f}"
+    ]
     
-    print("\nWeather Conditions:")
-    for condition, value in weather_assessment['weather_conditions'].items():
-        print(f"- {condition}: {value}")
+    lines.append("\nWeather Conditions:")
+    for condition, value in weather_assessment.weather_conditions.items():
+        lines.append(f"- {condition}: {value}")
     
-    print("\nRecommendations:")
-    for recommendation in weather_assessment['recommendations']:
-        print(f"- {recommendation}")
+    lines.append("\nRecommendations:")
+    for recommendation in weather_assessment.recommendations:
+        lines.append(f"- {recommendation}")
+    
+    sys.stdout.write("\n".join(lines) + "\n")
 
 def print_terrain_assessment(terrain_assessment: dict):
     """Print terrain assessment information."""
-    print("\nTerrain Assessment:")
-    print(f"Risk Level: {terrain_assessment['risk_level']}")
-    print(f"Risk Score: {terrain_assessment['risk_score']:.2f}")
+    lines = [
+        "\nTerrain Assessment:",
+        f"Risk Level: {_level_name(terrain_assessment['risk_level'])}",
+        f"Risk Score: {terrain_assessment['risk_score']:.2f}"
+    ]
     
-    print("\nTerrain Conditions:")
+    lines.append("\nTerrain Conditions:")
     for condition, value in terrain_assessment['terrain_conditions'].items():
-        print(f"- {condition}: {value}")
+        lines.append(f"- {condition}: {value}")
     
-    print("\nRecommendations:")
+    lines.append("\nRecommendations:")
     for recommendation in terrain_assessment['recommendations']:
-        print(f"- {recommendation}")
+        lines.append(f"- {recommendation}")
+    
+    sys.stdout.write("\n".join(lines) + "\n")
 
 def print_alerts(alerts: list):
     """Print system alerts."""
-    print("\nAlerts:")
+    lines = ["\nAlerts:"]
     for alert in alerts:
-        print(f"\nLevel: {alert['level']}")
-        print(f"Message: {alert['message']}")
-        print(f"Urgency: {alert['urgency']}")
-        print(f"Recommended Action: {alert['recommended_action']}")
+        lines.append(f"\nLevel: {alert['level']}")
+        lines.append(f"Message: {alert['message']}")
+        lines.append(f"Urgency: {alert['urgency']}")
+        lines.append(f"Recommended Action: {alert['recommended_action']}")
         if 'weather_conditions' in alert:
-            print("Weather Conditions:")
+            lines.append("Weather Conditions:")
             for condition, value in alert['weather_conditions'].items():
-                print(f"- {condition}: {value}")
+                lines.append(f"- {condition}: {value}")
         if 'terrain_conditions' in alert:
-            print("Terrain Conditions:")
+            lines.append("Terrain Conditions:")
             for condition, value in alert['terrain_conditions'].items():
-                print(f"- {condition}: {value}")
+                lines.append(f"- {condition}: {value}")
+    
+    sys.stdout.write("\n".join(lines) + "\n")
 
 def main():
     # Initialize Enhanced TCAS
@@ -187,8 +215,10 @@ def main():
     print("\n=== Enhanced TCAS System Output ===")
     print(f"Timestamp: {result['timestamp']}")
     
-    print_detailed_object_info(result['ownship'], "Ownship")
-    print_detailed_object_info(result['intruder'], "Intruder")
+    # Object details are only produced when the sensor pipeline ran
+    if result['ownship']:
+        print_detailed_object_info(result['ownship'], "Ownship")
+        print_detailed_object_info(result['intruder'], "Intruder")
     
     print_risk_assessment(result['risk_assessment'])
     
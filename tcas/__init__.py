@@ -1,20 +1,120 @@
-from typing import Dict, List, Optional, Any
+from typing import TYPE_CHECKING, Dict, Optional, Any, Sequence, Tuple, Iterator
+from concurrent.futures import ThreadPoolExecutor
+from itertools import chain
+import importlib
 import numpy as np
-from .model import ObjectClassifier
 from .data_processor import SensorDataProcessor, SensorData
 from .predictor import CollisionPredictor
-from .weather_integration import WeatherRiskAssessor, WeatherData
-from .terrain_awareness import TerrainAwarenessSystem, TerrainData
+from ._levels import RiskLevel
+from ._jit_core import adjust_risk, NO_LEVEL
+
+if TYPE_CHECKING:
+    from .weather_integration import WeatherRiskResult
+
+# Submodules imported on first attribute access (PEP 562)
+_LAZY_IMPORTS = {
+    'TCASObjectClassifier': '.model',
+    'WeatherRiskAssessor': '.weather_integration',
+    'WeatherData': '.weather_integration',
+    'WeatherRiskResult': '.weather_integration',
+    'WeatherDataBatch': '.weather_integration',
+    'TerrainAwarenessSystem': '.terrain_awareness',
+    'TerrainData': '.terrain_awareness'
+}
+
+def __getattr__(name: str) -> Any:
+    if name in _LAZY_IMPORTS:
+        value = getattr(importlib.import_module(_LAZY_IMPORTS[name], __name__), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 class EnhancedTCAS:
+    # Alert templates by risk level, copied when an alert is raised
+    _WEATHER_ALERTS = {
+        RiskLevel.CRITICAL: {
+            "level": "WEATHER_ALERT",
+            "message": "CRITICAL WEATHER CONDITIONS DETECTED",
+            "urgency": "CRITICAL",
+            "recommended_action": "IMMEDIATE WEATHER AVOIDANCE REQUIRED"
+        },
+        RiskLevel.HIGH: {
+            "level": "WEATHER_ALERT",
+            "message": "SEVERE WEATHER CONDITIONS DETECTED",
+            "urgency": "HIGH",
+            "recommended_action": "PREPARE FOR WEATHER AVOIDANCE"
+        }
+    }
+    _TERRAIN_ALERTS = {
+        RiskLevel.CRITICAL: {
+            "level": "TERRAIN_ALERT",
+            "message": "CRITICAL TERRAIN PROXIMITY",
+            "urgency": "CRITICAL",
+            "recommended_action": "IMMEDIATE TERRAIN AVOIDANCE REQUIRED"
+        },
+        RiskLevel.HIGH: {
+            "level": "TERRAIN_ALERT",
+            "message": "SEVERE TERRAIN PROXIMITY",
+            "urgency": "HIGH",
+            "recommended_action": "PREPARE FOR TERRAIN AVOIDANCE"
+        }
+    }
+    
+    # (level, urgency) of advisories raised for each recommendation
+    _WEATHER_ADVISORY = ("WEATHER_ADVISORY", "MEDIUM")
+    _TERRAIN_ADVISORY = ("TERRAIN_ADVISORY", "MEDIUM")
+    
+    # Result returned when the fast path rules out a conflict
+    _CLEAR_PAYLOAD = {
+        'ownship': None,
+        'intruder': None,
+        'risk_assessment': None,
+        'weather_assessment': None,
+        'terrain_assessment': None,
+        'alerts': None,
+        'timestamp': ''
+    }
+    
     def __init__(self):
         """Initialize the Enhanced TCAS system."""
-        self.classifier = ObjectClassifier()
         self.data_processor = SensorDataProcessor()
         self.predictor = CollisionPredictor()
-        self.weather_assessor = WeatherRiskAssessor()
-        self.terrain_assessor = TerrainAwarenessSystem()
         
+        # Built on first use, see the properties below
+        self._classifier = None
+        self._weather_assessor = None
+        self._terrain_assessor = None
+        
+        # Visual frames processed during the current update, keyed by id()
+        self._visual_cache: Dict[int, Tuple[np.ndarray, np.ndarray]] = {}
+        
+        # Ownship and intruder are processed in parallel
+        self._pool = ThreadPoolExecutor(max_workers=2)
+        
+    @property
+    def classifier(self):
+        """Object classifier, built on first use since it loads TensorFlow."""
+        if self._classifier is None:
+            from .model import TCASObjectClassifier
+            self._classifier = TCASObjectClassifier()
+        return self._classifier
+    
+    @property
+    def weather_assessor(self):
+        """Weather risk assessor, built on first update with weather data."""
+        if self._weather_assessor is None:
+            from .weather_integration import WeatherRiskAssessor
+            self._weather_assessor = WeatherRiskAssessor()
+        return self._weather_assessor
+    
+    @property
+    def terrain_assessor(self):
+        """Terrain awareness system, built on first update with terrain data."""
+        if self._terrain_assessor is None:
+            from .terrain_awareness import TerrainAwarenessSystem
+            self._terrain_assessor = TerrainAwarenessSystem()
+        return self._terrain_assessor
+    
     def process_update(self,
                       ownship_data: Dict[str, Any],
                       intruder_data: Dict[str, Any],
@@ -28,19 +128,42 @@ class EnhancedTCAS:
             weather_data: Optional dictionary containing weather data
             terrain_data: Optional dictionary containing terrain data
         Returns:
-            Dictionary containing processed results and alerts
+            Dictionary containing processed results and alerts; ownship and intruder
+            are None when the aircraft are clear of conflict and no weather or
+            terrain data is given
         """
-        # Process sensor data
-        ownship_processed = self.data_processor.process_sensor_data(ownship_data)
-        intruder_processed = self.data_processor.process_sensor_data(intruder_data)
+        # Skip the full pipeline when the aircraft cannot come into conflict
+        own_transponder = ownship_data.get('transponder', {})
+        intruder_transponder = intruder_data.get('transponder', {})
+        if not weather_data and not terrain_data and self.predictor.is_clear_of_conflict(
+                own_transponder, intruder_transponder):
+            return self._clear_payload(
+                ownship_data, self.predictor.assess_clear_of_conflict(own_transponder, intruder_transponder)
+            )
         
-        # Classify objects with enhanced detail
-        ownship_classification = self.classifier.classify_object(ownship_processed)
-        intruder_classification = self.classifier.classify_object(intruder_processed)
+        # Process ownship and intruder sensor data concurrently
+        self._visual_cache.clear()
+        if ownship_data['visual'] is intruder_data['visual']:
+            # Shared frame: process it once up front so both workers reuse it
+            self._process_visual(ownship_data['visual'])
+        ownship_future = self._pool.submit(self._process_sensor_data, ownship_data)
+        intruder_future = self._pool.submit(self._process_sensor_data, intruder_data)
+        ownship_processed = ownship_future.result()
+        intruder_processed = intruder_future.result()
+        
+        # Classify both objects in a single forward pass; the uint8 edge maps are
+        # converted to the classifier's float32 input here, after the OpenCV path
+        class_ids, confidences, detailed_classes = self.classifier.classify_batch(
+            np.stack([ownship_processed.image_data, intruder_processed.image_data], dtype=np.float32)
+        )
+        ownship_classification = (class_ids[0], confidences[0], detailed_classes[0])
+        intruder_classification = (class_ids[1], confidences[1], detailed_classes[1])
         
         # Generate detailed object information
-        ownship_info = self._generate_detailed_object_info(ownship_processed, ownship_classification)
-        intruder_info = self._generate_detailed_object_info(intruder_processed, intruder_classification)
+        ownship_info, intruder_info = self._generate_detailed_object_infos(
+            (ownship_processed, ownship_classification),
+            (intruder_processed, intruder_classification)
+        )
         
         # Detect collision risks
         risk_assessment = self.predictor.detect_collision_risk(ownship_processed, intruder_processed)
@@ -48,49 +171,27 @@ class EnhancedTCAS:
         # Process weather data if available
         weather_assessment = None
         if weather_data:
-            weather_data_obj = WeatherData(
-                visibility=weather_data.get('visibility', 10000),
-                precipitation_rate=weather_data.get('precipitation_rate', 0),
-                cloud_ceiling=weather_data.get('cloud_ceiling', 10000),
-                wind_speed=weather_data.get('wind_speed', 0),
-                wind_direction=weather_data.get('wind_direction', 0),
-                turbulence_index=weather_data.get('turbulence_index', 0),
-                icing_potential=weather_data.get('icing_potential', 0),
-                lightning_activity=weather_data.get('lightning_activity', 0)
-            )
+            from .weather_integration import weather_record
+            weather_data_obj = weather_record(weather_data)
             weather_assessment = self.weather_assessor.assess_weather_risk(weather_data_obj)
-            
-            # Adjust risk assessment based on weather conditions
-            risk_assessment = self._adjust_risk_for_weather(risk_assessment, weather_assessment)
         
         # Process terrain data if available
         terrain_assessment = None
         if terrain_data:
-            terrain_data_obj = TerrainData(
-                aircraft_altitude=terrain_data.get('aircraft_altitude', 0),
-                terrain_elevation=terrain_data.get('terrain_elevation', 0),
-                terrain_slope=terrain_data.get('terrain_slope', 0),
-                distance_to_terrain=terrain_data.get('distance_to_terrain', 10000),
-                terrain_type=terrain_data.get('terrain_type', 'unknown'),
-                terrain_roughness=terrain_data.get('terrain_roughness', 0),
-                terrain_obstacles=terrain_data.get('terrain_obstacles', []),
-                terrain_clearance=terrain_data.get('terrain_clearance', 10000)
-            )
+            from .terrain_awareness import TerrainData
+            terrain_data_obj = TerrainData.from_dict(terrain_data)
             terrain_assessment = self.terrain_assessor.assess_terrain_risk(terrain_data_obj)
-            
-            # Adjust risk assessment based on terrain conditions
-            risk_assessment = self._adjust_risk_for_terrain(risk_assessment, terrain_assessment)
         
-        # Generate alerts
-        alerts = self.predictor.generate_alert(risk_assessment)
+        # Adjust risk assessment based on weather and terrain conditions
+        if weather_assessment or terrain_assessment:
+            risk_assessment = self._adjust_risk(risk_assessment, weather_assessment, terrain_assessment)
         
-        # Add weather-related alerts if available
-        if weather_assessment:
-            alerts.extend(self._generate_weather_alerts(weather_assessment))
-            
-        # Add terrain-related alerts if available
-        if terrain_assessment:
-            alerts.extend(self._generate_terrain_alerts(terrain_assessment))
+        # Generate the collision alert followed by weather and terrain alerts if available
+        alerts = list(chain(
+            (self.predictor.generate_alert(risk_assessment),),
+            self._generate_weather_alerts(weather_assessment) if weather_assessment else (),
+            self._generate_terrain_alerts(terrain_assessment) if terrain_assessment else ()
+        ))
         
         return {
             'ownship': ownship_info,
@@ -102,125 +203,121 @@ class EnhancedTCAS:
             'timestamp': ownship_data.get('timestamp', '')
         }
     
-    def _generate_detailed_object_info(self, 
-                                    sensor_data: SensorData,
-                                    classification: Dict) -> Dict:
-        """Generate detailed information about detected objects."""
-        return {
-            'basic_info': {
-                'type': classification['type'],
-                'confidence': classification['confidence'],
-                'position': sensor_data.transponder_data['position'],
-                'altitude': sensor_data.transponder_data['altitude'],
-                'speed': sensor_data.transponder_data['speed'],
-                'heading': sensor_data.transponder_data['heading']
-            },
-            'detailed_classification': classification['detailed_classification'],
-            'possible_types': classification['possible_types'],
-            'confidence_scores': classification['confidence_scores'],
-            'additional_features': sensor_data.additional_features
-        }
+    def _clear_payload(self, ownship_data: Dict[str, Any], risk_assessment: Dict) -> Dict:
+        """
+        Build the result for an update with no possible conflict. The sensor
+        pipeline is skipped, so ownship and intruder are None.
+        """
+        payload = self._CLEAR_PAYLOAD.copy()
+        payload['risk_assessment'] = risk_assessment
+        payload['alerts'] = [self.predictor.generate_alert(risk_assessment)]
+        payload['timestamp'] = ownship_data.get('timestamp', '')
+        return payload
     
-    def _adjust_risk_for_weather(self, 
-                               risk_assessment: Dict,
-                               weather_assessment: Dict) -> Dict:
-        """Adjust risk assessment based on weather conditions."""
-        # Increase risk level if weather conditions are severe
-        if weather_assessment['risk_level'] == "CRITICAL":
-            risk_assessment['risk_level'] = "CRITICAL"
-        elif weather_assessment['risk_level'] == "HIGH" and risk_assessment['risk_level'] != "CRITICAL":
-            risk_assessment['risk_level'] = "HIGH"
-        
-        # Adjust separation requirements based on visibility
-        visibility_factor = weather_assessment['risk_factors']['visibility']
-        if visibility_factor >= 0.8:
-            risk_assessment['min_separation'] *= 1.5
-        elif visibility_factor >= 0.6:
-            risk_assessment['min_separation'] *= 1.2
-        
-        return risk_assessment
+    def _process_visual(self, visual: np.ndarray) -> np.ndarray:
+        """Process a visual frame, reusing the result if the frame was already processed this update."""
+        cached = self._visual_cache.get(id(visual))
+        if cached is None:
+            # Keep a reference to the source frame so its id() stays valid
+            processed = self.data_processor.process_visual_data(visual)
+            cached = (visual, processed)
+            self._visual_cache[id(visual)] = cached
+        return cached[1]
+    
+    def _process_sensor_data(self, raw_data: Dict[str, Any]) -> SensorData:
+        """Process raw sensor data, processing each distinct visual frame once per update."""
+        return self.data_processor.process_sensor_data(
+            raw_data,
+            processed_visual=self._process_visual(raw_data['visual'])
+        )
+    
+    def _generate_detailed_object_infos(self,
+                                        ownship: Tuple[SensorData, Tuple[int, float, Dict]],
+                                        intruder: Tuple[SensorData, Tuple[int, float, Dict]]) -> Tuple[Dict, Dict]:
+        """
+        Generate detailed information about both detected objects, each paired with its
+        (class_id, confidence, detailed_classification) entry from classify_batch.
+        """
+        infos = []
+        for sensor_data, (class_id, confidence, detailed) in (ownship, intruder):
+            confidence = float(confidence)
+            infos.append({
+                'basic_info': {
+                    'type': self.classifier.get_class_name(int(class_id)),
+                    'confidence': confidence,
+                    **sensor_data.basic._asdict()
+                },
+                'detailed_classification': {
+                    'main_category': detailed['main_category'],
+                    'subcategory': detailed['subcategory'],
+                    'specific_type': detailed['specific_type']
+                },
+                # Known models of the specific type, at the classification's confidence
+                'possible_types': [
+                    {'type': model, 'confidence': confidence}
+                    for model in detailed['available_types'].get(detailed['specific_type'], ())
+                ] if detailed['available_types'] else [],
+                'confidence_scores': {name: float(value) for name, value in detailed['confidences'].items()},
+                'additional_features': sensor_data.additional_features
+            })
+        return tuple(infos)
     
-    def _adjust_risk_for_terrain(self,
-                               risk_assessment: Dict,
-                               terrain_assessment: Dict) -> Dict:
-        """Adjust risk assessment based on terrain conditions."""
-        # Increase risk level if terrain conditions are severe
-        if terrain_assessment['risk_level'] == "CRITICAL":
-            risk_assessment['risk_level'] = "CRITICAL"
-        elif terrain_assessment['risk_level'] == "HIGH" and risk_assessment['risk_level'] != "CRITICAL":
-            risk_assessment['risk_level'] = "HIGH"
-        
-        # Adjust separation requirements based on terrain clearance
-        clearance_factor = terrain_assessment['risk_factors']['clearance']
-        if clearance_factor >= 0.8:
-            risk_assessment['min_separation'] *= 2.0
-        elif clearance_factor >= 0.6:
-            risk_assessment['min_separation'] *= 1.5
+    def _adjust_risk(self,
+                    risk_assessment: Dict,
+                    weather_assessment: Optional['WeatherRiskResult'],
+                    terrain_assessment: Optional[Dict]) -> Dict:
+        """Adjust risk assessment based on weather and terrain conditions."""
+        weather_level, visibility_factor = NO_LEVEL, 0.0
+        if weather_assessment:
+            weather_level = int(weather_assessment.risk_level)
+            visibility_factor = float(weather_assessment.visibility_risk)
+        
+        terrain_level, clearance_factor = NO_LEVEL, 0.0
+        if terrain_assessment:
+            terrain_level = int(terrain_assessment['risk_level'])
+            clearance_factor = float(terrain_assessment['risk_factors']['clearance'])
+        
+        risk_level, min_separation = adjust_risk(
+            int(risk_assessment['risk_level']),
+            float(risk_assessment['min_separation']),
+            weather_level,
+            visibility_factor,
+            terrain_level,
+            clearance_factor
+        )
         
+        risk_assessment['risk_level'] = RiskLevel(risk_level)
+        risk_assessment['min_separation'] = min_separation
         return risk_assessment
     
-    def _generate_weather_alerts(self, weather_assessment: Dict) -> List[Dict]:
+    def _generate_weather_alerts(self, weather_assessment: 'WeatherRiskResult') -> Iterator[Dict]:
         """Generate weather-related alerts."""
-        alerts = []
-        
         # Add weather-specific alerts based on risk level
-        if weather_assessment['risk_level'] == "CRITICAL":
-            alerts.append({
-                "level": "WEATHER_ALERT",
-                "message": "CRITICAL WEATHER CONDITIONS DETECTED",
-                "urgency": "CRITICAL",
-                "recommended_action": "IMMEDIATE WEATHER AVOIDANCE REQUIRED",
-                "weather_conditions": weather_assessment['weather_conditions']
-            })
-        elif weather_assessment['risk_level'] == "HIGH":
-            alerts.append({
-                "level": "WEATHER_ALERT",
-                "message": "SEVERE WEATHER CONDITIONS DETECTED",
-                "urgency": "HIGH",
-                "recommended_action": "PREPARE FOR WEATHER AVOIDANCE",
-                "weather_conditions": weather_assessment['weather_conditions']
-            })
+        template = self._WEATHER_ALERTS.get(weather_assessment.risk_level)
+        if template:
+            alert = template.copy()
+            alert['weather_conditions'] = weather_assessment.weather_conditions
+            yield alert
         
         # Add specific weather-related recommendations
-        for recommendation in weather_assessment['recommendations']:
-            alerts.append({
-                "level": "WEATHER_ADVISORY",
-                "message": recommendation,
-                "urgency": "MEDIUM",
-                "recommended_action": recommendation
-            })
-        
-        return alerts
+        yield from self._advisory_alerts(self._WEATHER_ADVISORY, weather_assessment.recommendations)
     
-    def _generate_terrain_alerts(self, terrain_assessment: Dict) -> List[Dict]:
+    def _generate_terrain_alerts(self, terrain_assessment: Dict) -> Iterator[Dict]:
         """Generate terrain-related alerts."""
-        alerts = []
-        
         # Add terrain-specific alerts based on risk level
-        if terrain_assessment['risk_level'] == "CRITICAL":
-            alerts.append({
-                "level": "TERRAIN_ALERT",
-                "message": "CRITICAL TERRAIN PROXIMITY",
-                "urgency": "CRITICAL",
-                "recommended_action": "IMMEDIATE TERRAIN AVOIDANCE REQUIRED",
-                "terrain_conditions": terrain_assessment['terrain_conditions']
-            })
-        elif terrain_assessment['risk_level'] == "HIGH":
-            alerts.append({
-                "level": "TERRAIN_ALERT",
-                "message": "SEVERE TERRAIN PROXIMITY",
-                "urgency": "HIGH",
-                "recommended_action": "PREPARE FOR TERRAIN AVOIDANCE",
-                "terrain_conditions": terrain_assessment['terrain_conditions']
-            })
+        template = self._TERRAIN_ALERTS.get(terrain_assessment['risk_level'])
+        if template:
+            alert = template.copy()
+            alert['terrain_conditions'] = terrain_assessment['terrain_conditions']
+            yield alert
         
         # Add specific terrain-related recommendations
-        for recommendation in terrain_assessment['recommendations']:
-            alerts.append({
-                "level": "TERRAIN_ADVISORY",
-                "message": recommendation,
-                "urgency": "MEDIUM",
-                "recommended_action": recommendation
-            })
-        
-        return alerts 
\ No newline at end of file
+        yield from self._advisory_alerts(self._TERRAIN_ADVISORY, terrain_assessment['recommendations'])
+    
+    @staticmethod
+    def _advisory_alerts(advisory: Tuple[str, str], recommendations: Sequence[str]) -> Iterator[Dict]:
+        """Generate one advisory alert per recommendation."""
+        level, urgency = advisory
+        for recommendation in recommendations:
+            yield {"level": level, "message": recommendation,
+                   "urgency": urgency, "recommended_action": recommendation}
\ No newline at end of file
@@ -0,0 +1,171 @@
+"""Numeric core for the per-update risk adjustment, weather risk scoring and
+closest-approach search.
+
+Risk levels are passed in and returned as plain integers (see ``RiskLevel``)
+so these functions can be compiled with Numba. Set ``NUMBA_DISABLE_JIT=1`` to run
+the plain Python version, e.g. when debugging.
+"""
+from bisect import bisect_left, bisect_right
+import numpy as np
+
+try:
+    from numba import njit, prange
+    HAVE_NUMBA = True
+except ImportError:  # Numba is optional; fall back to plain Python
+    HAVE_NUMBA = False
+    prange = range
+    
+    def njit(*args, **kwargs):
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        return lambda func: func
+
+from ._levels import RiskLevel
+
+HIGH = int(RiskLevel.HIGH)
+NO_LEVEL = -1  # Used when weather or terrain data is not available
+
+# Factor scores per threshold band, lowest band first
+BAND_SCORES = (0.2, 0.4, 0.6, 0.8, 1.0)
+# Lower bounds of the LOW, MEDIUM, HIGH and CRITICAL combined-risk bands
+RISK_LEVEL_BOUNDS = (0.2, 0.4, 0.6, 0.8)
+
+@njit(cache=True)
+def adjust_risk(risk_level, min_sep, weather_level, vis_factor, terrain_level, clearance_factor):
+    """
+    Adjust a collision risk level and minimum separation for weather and terrain.
+    Returns: (risk_level, min_separation)
+    """
+    # Severe weather raises the risk level to at least its own level
+    if weather_level >= HIGH and weather_level > risk_level:
+        risk_level = weather_level
+
+    # Increase separation requirements in low visibility
+    if weather_level != NO_LEVEL:
+        if vis_factor >= 0.8:
+            min_sep *= 1.5
+        elif vis_factor >= 0.6:
+            min_sep *= 1.2
+
+    # Severe terrain raises the risk level to at least its own level
+    if terrain_level >= HIGH and terrain_level > risk_level:
+        risk_level = terrain_level
+
+    # Increase separation requirements with low terrain clearance
+    if terrain_level != NO_LEVEL:
+        if clearance_factor >= 0.8:
+            min_sep *= 2.0
+        elif clearance_factor >= 0.6:
+            min_sep *= 1.5
+
+    return risk_level, min_sep
+
+def _weather_risk_loop(visibility, precipitation, wind_speed, turbulence, icing, lightning,
+                 visibility_bounds, precipitation_bounds, wind_bounds):
+    """
+    Score visibility, precipitation and wind against their sorted threshold
+    bounds and average them with the turbulence, icing and lightning factors.
+    Returns: (combined_risk, risk_level, visibility_risk, precipitation_risk, wind_risk)
+    """
+    # Visibility risk falls with each threshold reached
+    band = 4
+    for bound in visibility_bounds:
+        if visibility >= bound:
+            band -= 1
+    visibility_risk = BAND_SCORES[band]
+
+    # Precipitation and wind risk rise with each threshold exceeded
+    band = 0
+    for bound in precipitation_bounds:
+        if precipitation > bound:
+            band += 1
+    precipitation_risk = BAND_SCORES[band]
+
+    band = 0
+    for bound in wind_bounds:
+        if wind_speed > bound:
+            band += 1
+    wind_risk = BAND_SCORES[band]
+
+    combined_risk = (visibility_risk + precipitation_risk + wind_risk +
+                     turbulence + icing + lightning) / 6.0
+
+    risk_level = 0
+    for bound in RISK_LEVEL_BOUNDS:
+        if combined_risk >= bound:
+            risk_level += 1
+
+    return combined_risk, risk_level, visibility_risk, precipitation_risk, wind_risk
+
+def _weather_risk_bisect(visibility, precipitation, wind_speed, turbulence, icing, lightning,
+                         visibility_bounds, precipitation_bounds, wind_bounds):
+    """Bisect version of _weather_risk_loop, used when Numba is not installed."""
+    visibility_risk = BAND_SCORES[4 - bisect_right(visibility_bounds, visibility)]
+    precipitation_risk = BAND_SCORES[bisect_left(precipitation_bounds, precipitation)]
+    wind_risk = BAND_SCORES[bisect_left(wind_bounds, wind_speed)]
+    combined_risk = (visibility_risk + precipitation_risk + wind_risk +
+                     turbulence + icing + lightning) / 6.0
+    risk_level = bisect_right(RISK_LEVEL_BOUNDS, combined_risk)
+    return combined_risk, risk_level, visibility_risk, precipitation_risk, wind_risk
+
+if HAVE_NUMBA:
+    from numba import types
+    
+    # Explicit signature: compiled (or loaded from cache) at import, not on the first
+    # assessment. Scalars are converted to float64; bounds are the assessors' read-only arrays
+    _BOUNDS = types.Array(types.float64, 1, 'C', readonly=True)
+    _WEATHER_RISK_SIGNATURE = types.Tuple((types.float64, types.int64, types.float64, types.float64, types.float64))(
+        *(types.float64,) * 6, _BOUNDS, _BOUNDS, _BOUNDS
+    )
+    weather_risk = njit(_WEATHER_RISK_SIGNATURE, cache=True)(_weather_risk_loop)
+else:
+    weather_risk = _weather_risk_bisect
+
+@njit(parallel=True, cache=True)
+def weather_risk_batch(visibility, precipitation, wind_speed, turbulence, icing, lightning,
+                       visibility_bounds, precipitation_bounds, wind_bounds,
+                       combined_risk, risk_level, visibility_risk, precipitation_risk, wind_risk):
+    """
+    weather_risk for every sample, spread over threads with prange.
+    Results are written to the preallocated output arrays, one element per sample.
+    """
+    for i in prange(visibility.shape[0]):
+        result = weather_risk(visibility[i], precipitation[i], wind_speed[i],
+                              turbulence[i], icing[i], lightning[i],
+                              visibility_bounds, precipitation_bounds, wind_bounds)
+        combined_risk[i] = result[0]
+        risk_level[i] = result[1]
+        visibility_risk[i] = result[2]
+        precipitation_risk[i] = result[3]
+        wind_risk[i] = result[4]
+
+def _closest_approach_loop(own_pos, own_vel, intr_pos, intr_vel, window, steps):
+    """
+    Find the step of closest approach of two constant-velocity tracks.
+    Step k is positioned (k + 1) * window / steps seconds ahead, as in
+    CollisionPredictor.predict_trajectory.
+    Returns: (step_index, separation)
+    """
+    dt = window / steps
+    best_index = 0
+    best_dist_sq = 0.0
+    for k in range(steps):
+        t = (k + 1) * dt
+        dist_sq = 0.0
+        for j in range(3):
+            d = (own_pos[j] + own_vel[j] * t) - (intr_pos[j] + intr_vel[j] * t)
+            dist_sq += d * d
+        if k == 0 or dist_sq < best_dist_sq:
+            best_index = k
+            best_dist_sq = dist_sq
+    return best_index, np.sqrt(best_dist_sq)
+
+def _closest_approach_numpy(own_pos, own_vel, intr_pos, intr_vel, window, steps):
+    """NumPy version of _closest_approach_loop, used when Numba is not installed."""
+    t = (np.arange(steps) + 1) * (window / steps)
+    diff = (own_pos - intr_pos) + np.outer(t, own_vel - intr_vel)
+    dist = np.sqrt(np.einsum('ij,ij->i', diff, diff))
+    index = int(np.argmin(dist))
+    return index, dist[index]
+
+closest_approach = njit(cache=True)(_closest_approach_loop) if HAVE_NUMBA else _closest_approach_numpy
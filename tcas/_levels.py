@@ -0,0 +1,12 @@
+from enum import IntEnum
+
+class RiskLevel(IntEnum):
+    """Risk levels ordered by severity, so levels can be compared and merged with max()."""
+    NONE = 0
+    LOW = 1
+    MEDIUM = 2
+    HIGH = 3
+    CRITICAL = 4
+
+    def __str__(self) -> str:
+        return self.name
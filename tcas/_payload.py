@@ -0,0 +1,49 @@
+"""Wire encoding for MQTT payloads.
+
+Payloads are JSON (via orjson) by default, or MessagePack, which sends
+floats as raw 8-byte values and is smaller and faster to parse. Client and
+server must be configured with the same ``payload_format``; publishes carry
+the matching ``CONTENT_TYPES`` MIME type as their MQTT v5 Content-Type.
+"""
+import threading
+from typing import Any
+import numpy as np
+import orjson
+import msgpack
+
+CONTENT_TYPES = {
+    'json': 'application/json',
+    'msgpack': 'application/msgpack'
+}
+
+def _msgpack_default(obj: Any) -> Any:
+    """Convert NumPy values, which msgpack cannot pack natively."""
+    if isinstance(obj, np.generic):
+        return obj.item()
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    raise TypeError(f"Cannot serialize object of type {type(obj).__name__}")
+
+# One reusable msgpack Packer per thread, as Packer is not thread-safe. pack() still returns
+# new bytes each call; the saving is packb constructing and tearing down a Packer every time
+_packers = threading.local()
+
+def _packer() -> msgpack.Packer:
+    """Return this thread's Packer, creating it on first use."""
+    packer = getattr(_packers, 'packer', None)
+    if packer is None:
+        packer = msgpack.Packer(default=_msgpack_default, use_bin_type=True)
+        _packers.packer = packer
+    return packer
+
+def encode(data: Any, payload_format: str = 'json') -> bytes:
+    """Encode a payload for publishing."""
+    if payload_format == 'msgpack':
+        return _packer().pack(data)
+    return orjson.dumps(data, option=orjson.OPT_SERIALIZE_NUMPY)
+
+def decode(payload: bytes, payload_format: str = 'json') -> Any:
+    """Decode a received payload."""
+    if payload_format == 'msgpack':
+        return msgpack.unpackb(payload, raw=False)
+    return orjson.loads(payload)
@@ -1,16 +1,62 @@
+import math
+import threading
+from time import time_ns
+from bisect import bisect_right
 import numpy as np
 import cv2
-from dataclasses import dataclass
-from typing import Tuple, List, Dict, Any
+from dataclasses import dataclass, field
+from typing import Tuple, List, Dict, Any, Optional, NamedTuple, Iterable
 
-@dataclass
+class BasicInfo(NamedTuple):
+    """Basic transponder state of a tracked object."""
+    position: Dict[str, float]
+    altitude: float
+    speed: float
+    heading: float
+
+# Lookup tables for transponder categorization
+_CARDINAL_DIRECTIONS = ('N', 'NE', 'E', 'SE', 'S', 'SW', 'W', 'NW')
+_SPEED_BINS = (250, 400)  # knots; lower bounds of 'medium' and 'high'
+_SPEED_CATEGORIES = ('low', 'medium', 'high')
+
+def _heading_velocity(speed: float, heading: float) -> Tuple[float, float, float]:
+    """Level-flight velocity components for a speed along a heading in degrees."""
+    heading = math.radians(heading)
+    return (speed * math.cos(heading), speed * math.sin(heading), 0.0)
+
+def _as_uint8(frame: np.ndarray) -> np.ndarray:
+    """8-bit view of a visual frame; float frames are taken to hold values in [0, 1]."""
+    frame = np.asarray(frame)
+    if frame.dtype == np.uint8:
+        return frame
+    return (frame * 255).clip(0, 255).astype(np.uint8)
+
+# Structuring element for the morphological close, shared read-only across frames
+_MORPH_KERNEL = np.ones((3, 3), np.uint8)
+_MORPH_KERNEL.setflags(write=False)
+
+@dataclass(slots=True, frozen=True)
 class SensorData:
-    """Container for processed sensor data."""
+    """Container for processed sensor data. Instances are immutable once built."""
     image_data: np.ndarray
     transponder_data: Dict
     radar_data: Dict
-    timestamp: float
+    timestamp: int  # nanoseconds since the epoch
     additional_features: Dict[str, Any] = None
+    # Frequently read transponder fields, copied out of transponder_data
+    basic: BasicInfo = field(init=False)
+    # Velocity from speed and heading, computed once and reused for every pairing
+    velocity: Tuple[float, float, float] = field(init=False)
+
+    def __post_init__(self):
+        # Frozen dataclass, so the derived field is set through object.__setattr__
+        object.__setattr__(self, 'basic', BasicInfo(
+            position=self.transponder_data.get('position', {'lat': 0, 'lon': 0}),
+            altitude=self.transponder_data.get('altitude', 0),
+            speed=self.transponder_data.get('speed', 0),
+            heading=self.transponder_data.get('heading', 0)
+        ))
+        object.__setattr__(self, 'velocity', _heading_velocity(self.basic.speed, self.basic.heading))
 
 class SensorDataProcessor:
     def __init__(self):
@@ -19,11 +65,11 @@ class SensorDataProcessor:
             'radar': 0.4,
             'visual': 0.2
         }
-        self.feature_extractors = {
-            'size': self._extract_size_features,
-            'motion': self._extract_motion_features,
-            'shape': self._extract_shape_features
-        }
+        # Per-thread scratch buffers for the visual pipeline
+        self._buffers = threading.local()
+        # Per-feature normalization, identity until fit_feature_normalization is called
+        self._feat_mean = np.zeros(8)
+        self._feat_invstd = np.ones(8)
     
     def process_transponder_data(self, raw_data: Dict) -> Dict:
         """Process transponder data into standardized format."""
@@ -39,6 +85,27 @@ class SensorDataProcessor:
         }
         return processed
     
+    def process_transponder_batch(self, states: np.ndarray) -> Dict[str, np.ndarray]:
+        """
+        Process a batch of transponder states in one vectorized pass.
+        states: (N, 3) array of altitude, speed and heading
+        Returns a dictionary of per-field arrays of length N.
+        """
+        altitude, speed, heading = np.asarray(states, dtype=float).T
+        flight_level = np.where(
+            altitude >= 18000,
+            np.char.add('FL', (altitude / 100).astype(int).astype(str)),
+            np.char.add(altitude.astype(int).astype(str), 'ft')
+        )
+        return {
+            'altitude': altitude,
+            'speed': speed,
+            'heading': heading,
+            'flight_level': flight_level,
+            'speed_category': np.array(_SPEED_CATEGORIES)[np.searchsorted(_SPEED_BINS, speed, side='right')],
+            'heading_cardinal': np.array(_CARDINAL_DIRECTIONS)[np.rint(heading / 45).astype(int) & 7]
+        }
+    
     def process_radar_data(self, raw_data: Dict) -> Dict:
         """Process radar data into standardized format."""
         processed = {
@@ -54,23 +121,64 @@ class SensorDataProcessor:
         return processed
     
     def process_visual_data(self, image_data: np.ndarray) -> np.ndarray:
-        """Process visual sensor data with enhanced features."""
+        """
+        Process visual sensor data with enhanced features.
+        Takes uint8 frames, or float frames with values in [0, 1].
+        """
+        # Canny only accepts 8-bit input
+        image_data = _as_uint8(image_data)
+        
         # Convert to grayscale if needed
         if len(image_data.shape) == 3:
-            image_data = cv2.cvtColor(image_data, cv2.COLOR_BGR2GRAY)
+            gray = self._scratch('gray', image_data.shape[:2], image_data.dtype)
+            image_data = cv2.cvtColor(image_data, cv2.COLOR_BGR2GRAY, dst=gray)
         
-        # Apply basic image processing
-        image_data = cv2.GaussianBlur(image_data, (5, 5), 0)
-        image_data = cv2.Canny(image_data, 50, 150)
+        # Extract edges; Canny's own Sobel pass with the L2 gradient norm stands in for pre-smoothing
+        shape = image_data.shape
+        edges = self._scratch('edges', shape, np.uint8)
+        cv2.Canny(image_data, 50, 150, edges=edges, L2gradient=True)
         
         # Apply morphological operations for better feature extraction
-        kernel = np.ones((3,3), np.uint8)
-        image_data = cv2.morphologyEx(image_data, cv2.MORPH_CLOSE, kernel)
+        closed = self._scratch('closed', shape, np.uint8)
+        cv2.morphologyEx(edges, cv2.MORPH_CLOSE, _MORPH_KERNEL, dst=closed)
+        
+        # Single-channel edge map for CNN input (a new array, as the result outlives the scratch buffers)
+        return closed[..., np.newaxis].copy()
+    
+    def visual_dataset(self, frames: Iterable[np.ndarray], batch_size: int = 2):
+        """
+        Build a tf.data pipeline that processes a stream of visual frames in the background.
+        Frames are processed in parallel and prefetched, so OpenCV work on the next
+        batch overlaps with inference on the current one. Yields float32 batches of
+        shape (batch_size, H, W, 1) ready for TCASObjectClassifier.classify_batch.
+        """
+        import tensorflow as tf  # Only needed for streaming, keep the module TensorFlow-free
         
-        # Convert back to 3 channels for CNN input
-        image_data = cv2.cvtColor(image_data, cv2.COLOR_GRAY2BGR)
+        def preprocess(frame):
+            # Canny has no TensorFlow op, so run the OpenCV pipeline in a numpy_function
+            processed = tf.numpy_function(self.process_visual_data, [frame], tf.uint8)
+            processed.set_shape([None, None, 1])
+            return tf.cast(processed, tf.float32)
         
-        return image_data
+        options = tf.data.Options()
+        options.experimental_optimization.map_and_batch_fusion = True
+        dataset = tf.data.Dataset.from_generator(
+            lambda: (_as_uint8(frame) for frame in frames),
+            output_signature=tf.TensorSpec([None, None, 3], tf.uint8)
+        )
+        return (dataset
+                .map(preprocess, num_parallel_calls=tf.data.AUTOTUNE)
+                .batch(batch_size)
+                .prefetch(tf.data.AUTOTUNE)
+                .with_options(options))
+    
+    def _scratch(self, name: str, shape: Tuple[int, ...], dtype: np.dtype) -> np.ndarray:
+        """Return this thread's scratch buffer `name`, reallocated only when the frame shape or dtype changes."""
+        buffer = getattr(self._buffers, name, None)
+        if buffer is None or buffer.shape != shape or buffer.dtype != dtype:
+            buffer = np.empty(shape, dtype)
+            setattr(self._buffers, name, buffer)
+        return buffer
     
     def _calculate_flight_level(self, altitude: float) -> str:
         """Calculate flight level from altitude."""
@@ -80,17 +188,11 @@ class SensorDataProcessor:
     
     def _categorize_speed(self, speed: float) -> str:
         """Categorize aircraft speed."""
-        if speed >= 400:
-            return "high"
-        elif speed >= 250:
-            return "medium"
-        return "low"
+        return _SPEED_CATEGORIES[bisect_right(_SPEED_BINS, speed)]
     
     def _get_cardinal_heading(self, heading: float) -> str:
         """Convert heading to cardinal direction."""
-        directions = ['N', 'NE', 'E', 'SE', 'S', 'SW', 'W', 'NW']
-        index = round(heading / 45) % 8
-        return directions[index]
+        return _CARDINAL_DIRECTIONS[round(heading / 45) & 7]
     
     def _calculate_closing_rate(self, radar_data: Dict) -> float:
         """Calculate closing rate from radar data."""
@@ -100,21 +202,6 @@ class SensorDataProcessor:
         """Calculate aspect angle from radar data."""
         return radar_data.get('aspect_angle', 0)
     
-    def _extract_size_features(self, image_data: np.ndarray) -> Dict[str, float]:
-        """Extract size-related features from image."""
-        contours, _ = cv2.findContours(image_data, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
-        if not contours:
-            return {'area': 0, 'perimeter': 0, 'aspect_ratio': 0}
-        
-        largest_contour = max(contours, key=cv2.contourArea)
-        x, y, w, h = cv2.boundingRect(largest_contour)
-        
-        return {
-            'area': cv2.contourArea(largest_contour),
-            'perimeter': cv2.arcLength(largest_contour, True),
-            'aspect_ratio': float(w)/h if h != 0 else 0
-        }
-    
     def _extract_motion_features(self, image_data: np.ndarray) -> Dict[str, float]:
         """Extract motion-related features from image."""
         # Placeholder for motion features
@@ -124,62 +211,127 @@ class SensorDataProcessor:
             'acceleration': 0.0
         }
     
-    def _extract_shape_features(self, image_data: np.ndarray) -> Dict[str, float]:
-        """Extract shape-related features from image."""
+    def _extract_geometry_features(self, image_data: np.ndarray) -> Tuple[Dict[str, float], Dict[str, float]]:
+        """
+        Extract size- and shape-related features from image with a single contour pass.
+        Returns: (size_features, shape_features)
+        """
         contours, _ = cv2.findContours(image_data, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
         if not contours:
-            return {'circularity': 0, 'convexity': 0, 'solidity': 0}
+            return ({'area': 0, 'perimeter': 0, 'aspect_ratio': 0},
+                    {'circularity': 0, 'convexity': 0, 'solidity': 0})
         
-        largest_contour = max(contours, key=cv2.contourArea)
+        # Find the largest contour, keeping its area
+        largest_contour, area = None, -1.0
+        for contour in contours:
+            contour_area = cv2.contourArea(contour)
+            if contour_area > area:
+                largest_contour, area = contour, contour_area
         
-        # Calculate shape features
-        area = cv2.contourArea(largest_contour)
+        # Measurements shared by both feature sets
         perimeter = cv2.arcLength(largest_contour, True)
-        hull = cv2.convexHull(largest_contour)
-        hull_area = cv2.contourArea(hull)
+        x, y, w, h = cv2.boundingRect(largest_contour)
+        if cv2.isContourConvex(largest_contour):
+            # A convex contour is its own hull
+            hull_area, hull_perimeter = area, perimeter
+        else:
+            hull = cv2.convexHull(largest_contour)
+            hull_area = cv2.contourArea(hull)
+            hull_perimeter = cv2.arcLength(hull, True)
         
-        return {
+        size_features = {
+            'area': area,
+            'perimeter': perimeter,
+            'aspect_ratio': float(w)/h if h != 0 else 0
+        }
+        shape_features = {
             'circularity': 4 * np.pi * area / (perimeter * perimeter) if perimeter != 0 else 0,
-            'convexity': perimeter / cv2.arcLength(hull, True) if cv2.arcLength(hull, True) != 0 else 0,
+            'convexity': perimeter / hull_perimeter if hull_perimeter != 0 else 0,
             'solidity': area / hull_area if hull_area != 0 else 0
         }
+        return size_features, shape_features
+    
+    def _extract_all_features(self, image_data: np.ndarray) -> Dict[str, Dict[str, float]]:
+        """Extract the size, shape and motion features of a processed image."""
+        size_features, shape_features = self._extract_geometry_features(image_data)
+        return {
+            'size': size_features,
+            'shape': shape_features,
+            'motion': self._extract_motion_features(image_data)
+        }
     
     def extract_features(self, sensor_data: SensorData) -> np.ndarray:
         """Extract relevant features from sensor data."""
-        # Combine numerical features
-        numerical_features = np.array([
-            sensor_data.transponder_data['altitude'],
-            sensor_data.transponder_data['speed'],
-            sensor_data.transponder_data['heading'],
-            sensor_data.radar_data['range'],
-            sensor_data.radar_data['bearing'],
-            sensor_data.radar_data['elevation'],
-            sensor_data.radar_data['closing_rate'],
-            sensor_data.radar_data['aspect_angle']
-        ])
+        return self.extract_features_batch([sensor_data])[0]
+    
+    def extract_features_batch(self, sensor_data_list: List[SensorData]) -> np.ndarray:
+        """Extract features for several sensor data objects as an (N, 8) array, one row each."""
+        # Combine numerical features, filling each row in place
+        features = np.empty((len(sensor_data_list), 8))
+        for row, sensor_data in zip(features, sensor_data_list):
+            radar = sensor_data.radar_data
+            row[:] = (
+                sensor_data.basic.altitude,
+                sensor_data.basic.speed,
+                sensor_data.basic.heading,
+                radar['range'],
+                radar['bearing'],
+                radar['elevation'],
+                radar['closing_rate'],
+                radar['aspect_angle']
+            )
+        
+        # Standardize each feature column in place
+        features -= self._feat_mean
+        features *= self._feat_invstd
         
-        # Normalize numerical features
-        numerical_features = (numerical_features - np.mean(numerical_features)) / np.std(numerical_features)
+        return features
+    
+    def fit_feature_normalization(self, calibration_data: List[SensorData]):
+        """
+        Fit the per-feature mean and inverse standard deviation used by extract_features.
+        Features have different units (ft, kt, deg, m), so each column is scaled separately.
+        """
+        self._feat_mean = np.zeros(8)
+        self._feat_invstd = np.ones(8)
+        raw = self.extract_features_batch(calibration_data)
         
-        return numerical_features
+        std = raw.std(axis=0)
+        self._feat_mean = raw.mean(axis=0)
+        # Leave constant features unscaled rather than dividing by zero
+        self._feat_invstd = np.divide(1.0, std, out=np.ones_like(std), where=std > 0)
+    
+    def process_sensor_data(self,
+                            raw_data: Dict,
+                            processed_visual: Optional[np.ndarray] = None) -> SensorData:
+        """Process a raw sensor message with transponder, radar and visual data."""
+        return self.fuse_sensor_data(
+            raw_data.get('transponder', {}),
+            raw_data.get('radar', {}),
+            raw_data['visual'],
+            processed_visual=processed_visual
+        )
     
     def fuse_sensor_data(self, 
                         transponder_data: Dict,
                         radar_data: Dict,
-                        visual_data: np.ndarray) -> SensorData:
-        """Fuse different sensor data sources with enhanced features."""
+                        visual_data: np.ndarray,
+                        processed_visual: Optional[np.ndarray] = None) -> SensorData:
+        """
+        Fuse different sensor data sources with enhanced features.
+        If processed_visual is given, it is used instead of processing visual_data again.
+        """
         # Process each data source
         processed_transponder = self.process_transponder_data(transponder_data)
         processed_radar = self.process_radar_data(radar_data)
-        processed_visual = self.process_visual_data(visual_data)
+        if processed_visual is None:
+            processed_visual = self.process_visual_data(visual_data)
         
         # Extract additional features
-        additional_features = {}
-        for feature_name, extractor in self.feature_extractors.items():
-            additional_features[feature_name] = extractor(processed_visual)
+        additional_features = self._extract_all_features(processed_visual)
         
         # Create timestamp
-        timestamp = np.datetime64('now').astype(float)
+        timestamp = time_ns()
         
         # Create SensorData object with additional features
         return SensorData(
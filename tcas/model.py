@@ -3,16 +3,51 @@ from tensorflow.keras import layers, models
 from typing import Dict, Tuple, List
 import numpy as np
 
+# Let TensorFlow grow GPU memory on demand instead of reserving it all up front
+for _gpu in tf.config.list_physical_devices('GPU'):
+    try:
+        tf.config.experimental.set_memory_growth(_gpu, True)
+    except RuntimeError:  # The GPU was already initialized elsewhere
+        pass
+
+# Batch sizes compiled ahead of the first classification: classify_object and process_update
+_WARMUP_BATCH_SIZES = (1, 2)
+
+# (main category, subcategory, specific type) of each class ID, indexed by class ID
+_CLASS_MAP = (
+    ("aircraft", "commercial", "narrow_body"),
+    ("aircraft", "commercial", "wide_body"),
+    ("aircraft", "commercial", "regional"),
+    ("aircraft", "business", "light"),
+    ("aircraft", "business", "medium"),
+    ("aircraft", "business", "heavy"),
+    ("ground_vehicle", "airport", "service"),
+    ("ground_vehicle", "airport", "maintenance"),
+    ("ground_vehicle", "airport", "emergency"),
+    ("terrain", "natural", "mountain"),
+    ("terrain", "man_made", "urban"),
+    ("runway", "surface", "paved")
+)
+_UNKNOWN_CLASS = ("unknown", "unknown", "unknown")
+
 class TCASObjectClassifier:
     def __init__(self):
         self.model = self._build_model()
         self.class_hierarchy = self._build_class_hierarchy()
+        # Available types of each class ID, looked up once instead of per classification
+        self._available_types = tuple(
+            self.class_hierarchy.get(main_cat, {}).get(sub_cat, [])
+            for main_cat, sub_cat, _ in _CLASS_MAP
+        )
+        self._infer = self._build_inference_function()
+        self._interpreter = None  # TFLite INT8 interpreter, set by quantize()
+        self._warm_up()
         
     def _build_model(self):
         """Build a CNN model optimized for real-time object classification."""
         model = models.Sequential([
-            # Input layer - expecting 64x64x3 sensor data
-            layers.Conv2D(32, (3, 3), activation='relu', input_shape=(64, 64, 3)),
+            # Input layer - expecting 64x64x1 edge maps
+            layers.Conv2D(32, (3, 3), activation='relu', input_shape=(64, 64, 1)),
             layers.MaxPooling2D((2, 2)),
             
             # 1st convolutional block
@@ -47,6 +82,45 @@ class TCASObjectClassifier:
         
         return model
     
+    def _build_inference_function(self):
+        """
+        Trace preprocessing and the forward pass into one XLA-compiled concrete function.
+        Takes a float32 batch of shape (N, H, W, 1) with raw pixel values.
+        """
+        inference_model = self._fold_input_scaling()
+        
+        @tf.function(input_signature=[tf.TensorSpec([None, None, None, 1], tf.float32)],
+                     jit_compile=True)
+        def infer(batch):
+            # Resize to 64x64 (a no-op for 64x64 input); pixel scaling is folded into the model
+            return inference_model(tf.image.resize(batch, (64, 64)), training=False)
+        
+        return infer.get_concrete_function()
+    
+    def _warm_up(self):
+        """
+        Run the inference function once per common batch size so XLA compiles it
+        now rather than stalling the first real classification.
+        """
+        for batch_size in _WARMUP_BATCH_SIZES:
+            self._infer(tf.zeros([batch_size, 64, 64, 1], dtype=tf.float32))
+    
+    def _fold_input_scaling(self):
+        """
+        Build an inference copy of the model that takes raw pixel values.
+        The /255.0 input normalization is folded into the first Conv2D kernel
+        (conv(x / 255) == conv'(x) with W' = W / 255, b' = b), removing a
+        full-tensor divide per inference. self.model itself is left unchanged.
+        """
+        inference_model = models.clone_model(self.model)
+        inference_model.set_weights(self.model.get_weights())
+        
+        first_conv = inference_model.layers[0]
+        kernel, bias = first_conv.get_weights()
+        first_conv.set_weights([kernel / 255.0, bias])
+        
+        return inference_model
+    
     def _build_class_hierarchy(self) -> Dict:
         """Build a hierarchical classification system."""
         return {
@@ -101,28 +175,54 @@ class TCASObjectClassifier:
             }
         }
     
-    def preprocess_input(self, sensor_data):
-        """Preprocess sensor data for model input."""
-        # Resize to 64x64x3 if needed
-        if sensor_data.shape != (64, 64, 3):
-            sensor_data = tf.image.resize(sensor_data, (64, 64))
+    def quantize(self, representative_frames: np.ndarray):
+        """
+        Quantize the classifier to full INT8 with TFLite and use it for inference.
+        representative_frames: (N, 64, 64, 1) raw pixel frames used to calibrate
+        activation ranges. Call again after load_weights.
+        """
+        # Convert the folded model so the uint8 input takes raw pixel values
+        converter = tf.lite.TFLiteConverter.from_keras_model(self._fold_input_scaling())
+        converter.optimizations = [tf.lite.Optimize.DEFAULT]
+        converter.representative_dataset = lambda: (
+            [frame[np.newaxis].astype(np.float32)] for frame in representative_frames
+        )
+        converter.target_spec.supported_ops = [tf.lite.OpsSet.TFLITE_BUILTINS_INT8]
+        converter.inference_input_type = tf.uint8
+        converter.inference_output_type = tf.uint8
+        
+        self._interpreter = tf.lite.Interpreter(model_content=converter.convert())
+        self._interpreter.allocate_tensors()
+    
+    def _predict(self, batch: np.ndarray) -> np.ndarray:
+        """Get class probabilities for an (N, H, W, 1) batch of raw pixel values."""
+        if self._interpreter is None:
+            return self._infer(tf.convert_to_tensor(batch, dtype=tf.float32)).numpy()
         
-        # Normalize pixel values
-        sensor_data = sensor_data / 255.0
+        input_details = self._interpreter.get_input_details()[0]
+        output_details = self._interpreter.get_output_details()[0]
+        if input_details['shape'][0] != len(batch):
+            self._interpreter.resize_tensor_input(input_details['index'], [len(batch), 64, 64, 1])
+            self._interpreter.allocate_tensors()
         
-        # Add batch dimension
-        return tf.expand_dims(sensor_data, 0)
+        # Resize and quantize the input, then dequantize the output
+        batch = tf.image.resize(tf.convert_to_tensor(batch, dtype=tf.float32), (64, 64)).numpy()
+        input_scale, input_zero_point = input_details['quantization']
+        quantized = np.clip(np.round(batch / input_scale + input_zero_point), 0, 255).astype(np.uint8)
+        self._interpreter.set_tensor(input_details['index'], quantized)
+        self._interpreter.invoke()
+        
+        output_scale, output_zero_point = output_details['quantization']
+        output = self._interpreter.get_tensor(output_details['index'])
+        return (output.astype(np.float32) - output_zero_point) * output_scale
     
     def classify_object(self, sensor_data) -> Tuple[int, float, Dict]:
         """
         Classify object from sensor data.
         Returns: (class_id, confidence_score, detailed_classification)
         """
-        # Preprocess input
-        processed_data = self.preprocess_input(sensor_data)
-        
-        # Get prediction
-        predictions = self.model.predict(processed_data, verbose=0)
+        # Preprocess and get prediction
+        predictions = self._predict(np.expand_dims(sensor_data, 0))
         
         # Get class with highest confidence
         class_id = tf.argmax(predictions[0]).numpy()
@@ -133,25 +233,28 @@ class TCASObjectClassifier:
         
         return class_id, confidence, detailed_class
     
+    def classify_batch(self, sensor_batch: np.ndarray) -> Tuple[np.ndarray, np.ndarray, List[Dict]]:
+        """
+        Classify a batch of sensor images of shape (N, H, W, C) in one forward pass.
+        Returns: (class_ids, confidence_scores, detailed_classifications)
+        """
+        # Preprocess and get predictions for every item in one call
+        predictions = self._predict(sensor_batch)
+        
+        class_ids = np.argmax(predictions, axis=1)
+        confidences = np.max(predictions, axis=1)
+        detailed_classes = [
+            self.get_detailed_classification(int(class_id), item_predictions)
+            for class_id, item_predictions in zip(class_ids, predictions)
+        ]
+        
+        return class_ids, confidences, detailed_classes
+    
     def get_detailed_classification(self, class_id: int, predictions: np.ndarray) -> Dict:
         """Get detailed classification information including subcategories."""
         # Map class_id to hierarchical classification
-        class_mapping = {
-            0: ("aircraft", "commercial", "narrow_body"),
-            1: ("aircraft", "commercial", "wide_body"),
-            2: ("aircraft", "commercial", "regional"),
-            3: ("aircraft", "business", "light"),
-            4: ("aircraft", "business", "medium"),
-            5: ("aircraft", "business", "heavy"),
-            6: ("ground_vehicle", "airport", "service"),
-            7: ("ground_vehicle", "airport", "maintenance"),
-            8: ("ground_vehicle", "airport", "emergency"),
-            9: ("terrain", "natural", "mountain"),
-            10: ("terrain", "man_made", "urban"),
-            11: ("runway", "surface", "paved")
-        }
-        
-        main_cat, sub_cat, specific = class_mapping.get(class_id, ("unknown", "unknown", "unknown"))
+        known = 0 <= class_id < len(_CLASS_MAP)
+        main_cat, sub_cat, specific = _CLASS_MAP[class_id] if known else _UNKNOWN_CLASS
         
         # Get confidence scores for subcategories
         subcategory_confidences = {
@@ -165,7 +268,7 @@ class TCASObjectClassifier:
             "subcategory": sub_cat,
             "specific_type": specific,
             "confidences": subcategory_confidences,
-            "available_types": self.class_hierarchy.get(main_cat, {}).get(sub_cat, [])
+            "available_types": self._available_types[class_id] if known else []
         }
     
     def get_class_name(self, class_id: int) -> str:
@@ -192,4 +295,8 @@ class TCASObjectClassifier:
     
     def load_weights(self, weights_path):
         """Load pre-trained weights."""
-        self.model.load_weights(weights_path) 
+        self.model.load_weights(weights_path)
+        # Rebuild the folded inference model from the new weights
+        self._infer = self._build_inference_function()
+        self._interpreter = None
+        self._warm_up()
@@ -1,15 +1,23 @@
 import paho.mqtt.client as mqtt
-import json
+from paho.mqtt.packettypes import PacketTypes
+from paho.mqtt.properties import Properties
+import socket
 import time
+from operator import attrgetter
 from typing import Dict, Any, Optional, Callable
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass
 from .data_processor import SensorData
+from ._payload import CONTENT_TYPES, encode, decode
 import logging
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# SensorData fields sent over MQTT; image_data is not serializable and stays local
+SENSOR_WIRE_FIELDS = ('timestamp', 'transponder_data', 'radar_data', 'additional_features')
+_sensor_wire_values = attrgetter(*SENSOR_WIRE_FIELDS)
+
 @dataclass
 class MQTTConfig:
     """Configuration for MQTT client."""
@@ -20,6 +28,8 @@ class MQTTConfig:
     username: Optional[str] = None
     password: Optional[str] = None
     topics: Dict[str, str] = None
+    payload_format: str = "json"  # "json" or "msgpack"; must match on client and server
+    alert_expiry_interval: int = 30  # Seconds the broker keeps an undelivered alert before discarding it
 
     def __post_init__(self):
         if self.topics is None:
@@ -38,7 +48,11 @@ class TCASMQTTClient:
             config: MQTT configuration parameters
         """
         self.config = config
-        self.client = mqtt.Client(client_id=config.client_id)
+        self.client = mqtt.Client(
+            callback_api_version=mqtt.CallbackAPIVersion.VERSION2,
+            client_id=config.client_id,
+            protocol=mqtt.MQTTv5
+        )
         self.connected = False
         self.callbacks = {}
         
@@ -58,6 +72,18 @@ class TCASMQTTClient:
             'status': 0,       # At most once delivery
             'config': 1        # At least once delivery
         }
+        # Subscription QoS keyed by the actual topic string
+        self._topic_qos = {
+            topic: self.qos_levels.get(name, 0) for name, topic in config.topics.items()
+        }
+        
+        # MQTTv5 publish properties naming the payload codec, so subscribers can decode it
+        self._publish_properties = Properties(PacketTypes.PUBLISH)
+        self._publish_properties.ContentType = CONTENT_TYPES[config.payload_format]
+        # Shared by every alert, which also expires at the broker when stale
+        self._alert_properties = Properties(PacketTypes.PUBLISH)
+        self._alert_properties.ContentType = CONTENT_TYPES[config.payload_format]
+        self._alert_properties.MessageExpiryInterval = config.alert_expiry_interval
     
     def connect(self) -> bool:
         """Connect to MQTT broker."""
@@ -68,10 +94,10 @@ class TCASMQTTClient:
                 self.config.keepalive
             )
             self.client.loop_start()
-            logger.info(f"Connected to MQTT broker at {self.config.broker_address}")
+            logger.info("Connected to MQTT broker at %s", self.config.broker_address)
             return True
         except Exception as e:
-            logger.error(f"Failed to connect to MQTT broker: {str(e)}")
+            logger.error("Failed to connect to MQTT broker: %s", e)
             return False
     
     def disconnect(self):
@@ -81,22 +107,26 @@ class TCASMQTTClient:
         self.connected = False
         logger.info("Disconnected from MQTT broker")
     
-    def _on_connect(self, client, userdata, flags, rc):
+    def _on_connect(self, client, userdata, flags, reason_code, properties):
         """Callback for when the client connects to the broker."""
-        if rc == 0:
+        if not reason_code.is_failure:
             self.connected = True
             logger.info("Connected to MQTT broker")
+            # Send small sensor packets immediately instead of waiting on Nagle's algorithm
+            sock = client.socket()
+            if sock is not None:
+                sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
             # Subscribe to relevant topics
             for topic in self.config.topics.values():
-                self.client.subscribe(topic, qos=self.qos_levels.get(topic, 0))
+                self.client.subscribe(topic, qos=self._topic_qos[topic])
         else:
-            logger.error(f"Failed to connect to MQTT broker with code: {rc}")
+            logger.error("Failed to connect to MQTT broker with code: %s", reason_code)
     
-    def _on_disconnect(self, client, userdata, rc):
+    def _on_disconnect(self, client, userdata, disconnect_flags, reason_code, properties):
         """Callback for when the client disconnects from the broker."""
         self.connected = False
-        if rc != 0:
-            logger.warning("Unexpected disconnection from MQTT broker")
+        if reason_code != 0:
+            logger.warning("Unexpected disconnection from MQTT broker: %s", reason_code)
         else:
             logger.info("Disconnected from MQTT broker")
     
@@ -104,15 +134,15 @@ class TCASMQTTClient:
         """Callback for when a message is received."""
         try:
             topic = message.topic
-            payload = json.loads(message.payload.decode())
+            payload = decode(message.payload, self.config.payload_format)
             
             # Call registered callback if exists
             if topic in self.callbacks:
                 self.callbacks[topic](payload)
             
-            logger.debug(f"Received message on topic {topic}: {payload}")
+            logger.debug("Received message on topic %s: %s", topic, payload)
         except Exception as e:
-            logger.error(f"Error processing message: {str(e)}")
+            logger.error("Error processing message: %s", e)
     
     def register_callback(self, topic: str, callback: Callable):
         """Register a callback function for a specific topic."""
@@ -126,29 +156,25 @@ class TCASMQTTClient:
         
         try:
             # Convert SensorData to dictionary
-            data_dict = {
-                'timestamp': sensor_data.timestamp,
-                'transponder_data': sensor_data.transponder_data,
-                'radar_data': sensor_data.radar_data,
-                'additional_features': sensor_data.additional_features
-            }
+            data_dict = dict(zip(SENSOR_WIRE_FIELDS, _sensor_wire_values(sensor_data)))
             
             # Publish with QoS 1 for reliable delivery
             result = self.client.publish(
                 self.config.topics['sensor_data'],
-                json.dumps(data_dict),
-                qos=self.qos_levels['sensor_data']
+                encode(data_dict, self.config.payload_format),
+                qos=self.qos_levels['sensor_data'],
+                properties=self._publish_properties
             )
             
             if result.rc == mqtt.MQTT_ERR_SUCCESS:
                 logger.debug("Published sensor data successfully")
                 return True
             else:
-                logger.error(f"Failed to publish sensor data: {result.rc}")
+                logger.error("Failed to publish sensor data: %s", result.rc)
                 return False
                 
         except Exception as e:
-            logger.error(f"Error publishing sensor data: {str(e)}")
+            logger.error("Error publishing sensor data: %s", e)
             return False
     
     def publish_alert(self, alert_data: Dict[str, Any]):
@@ -164,19 +190,20 @@ class TCASMQTTClient:
             # Publish with QoS 2 for exactly once delivery
             result = self.client.publish(
                 self.config.topics['alerts'],
-                json.dumps(alert_data),
-                qos=self.qos_levels['alerts']
+                encode(alert_data, self.config.payload_format),
+                qos=self.qos_levels['alerts'],
+                properties=self._alert_properties
             )
             
             if result.rc == mqtt.MQTT_ERR_SUCCESS:
-                logger.info(f"Published alert: {alert_data.get('message', 'No message')}")
+                logger.info("Published alert: %s", alert_data.get('message', 'No message'))
                 return True
             else:
-                logger.error(f"Failed to publish alert: {result.rc}")
+                logger.error("Failed to publish alert: %s", result.rc)
                 return False
                 
         except Exception as e:
-            logger.error(f"Error publishing alert: {str(e)}")
+            logger.error("Error publishing alert: %s", e)
             return False
     
     def publish_status(self, status_data: Dict[str, Any]):
@@ -192,17 +219,18 @@ class TCASMQTTClient:
             # Publish with QoS 0 for status updates
             result = self.client.publish(
                 self.config.topics['status'],
-                json.dumps(status_data),
-                qos=self.qos_levels['status']
+                encode(status_data, self.config.payload_format),
+                qos=self.qos_levels['status'],
+                properties=self._publish_properties
             )
             
             if result.rc == mqtt.MQTT_ERR_SUCCESS:
                 logger.debug("Published status update successfully")
                 return True
             else:
-                logger.error(f"Failed to publish status: {result.rc}")
+                logger.error("Failed to publish status: %s", result.rc)
                 return False
                 
         except Exception as e:
-            logger.error(f"Error publishing status: {str(e)}")
+            logger.error("Error publishing status: %s", e)
             return False 
\ No newline at end of file
@@ -1,5 +1,4 @@
 import time
-import json
 from mqtt_client import TCASMQTTClient, MQTTConfig as ClientConfig
 from mqtt_server import TCASMQTTServer, MQTTConfig as ServerConfig
 from data_processor import SensorData
@@ -51,7 +50,7 @@ def main():
                 'strength': 0.8,
                 'relative_velocity': 100
             },
-            timestamp=time.time(),
+            timestamp=time.time_ns(),
             additional_features={
                 'classification_confidence': 0.95,
                 'object_type': 'aircraft'
@@ -75,7 +74,7 @@ def main():
                 'strength': 0.85,
                 'relative_velocity': -80
             },
-            timestamp=time.time(),
+            timestamp=time.time_ns(),
             additional_features={
                 'classification_confidence': 0.92,
                 'object_type': 'aircraft'
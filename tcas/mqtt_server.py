@@ -1,12 +1,17 @@
 import paho.mqtt.client as mqtt
-import json
+from paho.mqtt.packettypes import PacketTypes
+from paho.mqtt.properties import Properties
 import logging
-from typing import Dict, Any, Optional, Callable
+import socket
+import threading
+from collections import OrderedDict, deque
+from typing import Dict, Any, Optional, Callable, List
 from dataclasses import dataclass
 from .data_processor import SensorData, SensorDataProcessor
 from .predictor import CollisionPredictor
 from .weather_integration import WeatherRiskAssessor, WeatherData
 from .terrain_awareness import TerrainAwarenessSystem, TerrainData
+from ._payload import CONTENT_TYPES, encode, decode
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -22,6 +27,12 @@ class MQTTConfig:
     username: Optional[str] = None
     password: Optional[str] = None
     topics: Dict[str, str] = None
+    payload_format: str = "json"  # "json" or "msgpack"; must match on client and server
+    alert_expiry_interval: int = 30  # Seconds the broker keeps an undelivered alert before discarding it
+    max_tracked_aircraft: int = 256  # Least recently updated aircraft are dropped beyond this
+    max_queued_messages: int = 10000  # Oldest unprocessed messages are dropped beyond this
+    batch_alerts: bool = False  # Publish each update's pair alerts as one list payload; subscribers must expect a list
+    info_alerts: bool = True  # Also publish INFO alerts for pairs with the updated aircraft that stay clear
 
     def __post_init__(self):
         if self.topics is None:
@@ -40,7 +51,11 @@ class TCASMQTTServer:
             config: MQTT configuration parameters
         """
         self.config = config
-        self.client = mqtt.Client(client_id=config.client_id)
+        self.client = mqtt.Client(
+            callback_api_version=mqtt.CallbackAPIVersion.VERSION2,
+            client_id=config.client_id,
+            protocol=mqtt.MQTTv5
+        )
         self.connected = False
         self.callbacks = {}
         
@@ -66,9 +81,40 @@ class TCASMQTTServer:
             'status': 0,       # At most once delivery
             'config': 1        # At least once delivery
         }
+        # Subscription QoS keyed by the actual topic string
+        self._topic_qos = {
+            topic: self.qos_levels.get(name, 0) for name, topic in config.topics.items()
+        }
+        
+        # MQTTv5 publish properties shared by every alert: the payload codec for subscribers,
+        # and an expiry so stale alerts are discarded at the broker
+        self._alert_properties = Properties(PacketTypes.PUBLISH)
+        self._alert_properties.ContentType = CONTENT_TYPES[config.payload_format]
+        self._alert_properties.MessageExpiryInterval = config.alert_expiry_interval
         
-        # Store latest sensor data
-        self.latest_sensor_data: Dict[str, SensorData] = {}
+        # Message handlers keyed by the actual topic string
+        self._topic_handlers = {
+            config.topics['sensor_data']: self._process_sensor_data,
+            config.topics['status']: self._process_status_update,
+            config.topics['config']: self._process_config_update
+        }
+        
+        # Alert QoS by alert level: only resolution advisories need exactly once delivery
+        self.alert_qos_levels = {
+            'RA': 2,        # Exactly once delivery
+            'TA': 1,        # At least once delivery
+            'ADVISORY': 0,  # At most once delivery
+            'INFO': 0       # At most once delivery
+        }
+        
+        # Store latest sensor data, least recently updated aircraft first
+        self.latest_sensor_data: OrderedDict[str, SensorData] = OrderedDict()
+        
+        # Received (topic, payload) messages, processed by the worker thread off the network thread
+        self._inbox = deque(maxlen=config.max_queued_messages)
+        self._inbox_ready = threading.Condition()
+        self._worker: Optional[threading.Thread] = None
+        self._stopping = False
     
     def connect(self) -> bool:
         """Connect to MQTT broker."""
@@ -79,59 +125,99 @@ class TCASMQTTServer:
                 self.config.keepalive
             )
             self.client.loop_start()
-            logger.info(f"Connected to MQTT broker at {self.config.broker_address}")
+            self._start_worker()
+            logger.info("Connected to MQTT broker at %s", self.config.broker_address)
             return True
         except Exception as e:
-            logger.error(f"Failed to connect to MQTT broker: {str(e)}")
+            logger.error("Failed to connect to MQTT broker: %s", e)
             return False
     
     def disconnect(self):
         """Disconnect from MQTT broker."""
         self.client.loop_stop()
+        self._stop_worker()
         self.client.disconnect()
         self.connected = False
         logger.info("Disconnected from MQTT broker")
     
-    def _on_connect(self, client, userdata, flags, rc):
+    def _start_worker(self):
+        """Start the thread that processes received messages."""
+        if self._worker is not None and self._worker.is_alive():
+            return
+        self._stopping = False
+        self._worker = threading.Thread(target=self._process_messages, name="tcas-mqtt-worker", daemon=True)
+        self._worker.start()
+    
+    def _stop_worker(self):
+        """Stop the message processing thread, discarding unprocessed messages."""
+        if self._worker is None:
+            return
+        with self._inbox_ready:
+            self._stopping = True
+            self._inbox.clear()
+            self._inbox_ready.notify()
+        self._worker.join()
+        self._worker = None
+    
+    def _on_connect(self, client, userdata, flags, reason_code, properties):
         """Callback for when the client connects to the broker."""
-        if rc == 0:
+        if not reason_code.is_failure:
             self.connected = True
             logger.info("Connected to MQTT broker")
+            # Send small alert packets immediately instead of waiting on Nagle's algorithm
+            sock = client.socket()
+            if sock is not None:
+                sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
             # Subscribe to relevant topics
             for topic in self.config.topics.values():
-                self.client.subscribe(topic, qos=self.qos_levels.get(topic, 0))
+                self.client.subscribe(topic, qos=self._topic_qos[topic])
         else:
-            logger.error(f"Failed to connect to MQTT broker with code: {rc}")
+            logger.error("Failed to connect to MQTT broker with code: %s", reason_code)
     
-    def _on_disconnect(self, client, userdata, rc):
+    def _on_disconnect(self, client, userdata, disconnect_flags, reason_code, properties):
         """Callback for when the client disconnects from the broker."""
         self.connected = False
-        if rc != 0:
-            logger.warning("Unexpected disconnection from MQTT broker")
+        if reason_code != 0:
+            logger.warning("Unexpected disconnection from MQTT broker: %s", reason_code)
         else:
             logger.info("Disconnected from MQTT broker")
     
     def _on_message(self, client, userdata, message):
-        """Callback for when a message is received."""
+        """Callback for when a message is received; queues it for the worker thread."""
+        with self._inbox_ready:
+            if len(self._inbox) == self._inbox.maxlen:
+                logger.debug("Message queue full, dropping oldest message")
+            self._inbox.append((message.topic, message.payload))
+            self._inbox_ready.notify()
+    
+    def _process_messages(self):
+        """Worker loop: process queued messages in arrival order until stopped."""
+        while True:
+            with self._inbox_ready:
+                while not self._inbox and not self._stopping:
+                    self._inbox_ready.wait()
+                if self._stopping:
+                    return
+                topic, raw_payload = self._inbox.popleft()
+            self._handle_message(topic, raw_payload)
+    
+    def _handle_message(self, topic: str, raw_payload: bytes):
+        """Decode a received message and dispatch it to its topic handler and callback."""
         try:
-            topic = message.topic
-            payload = json.loads(message.payload.decode())
+            payload = decode(raw_payload, self.config.payload_format)
             
             # Process message based on topic
-            if topic == self.config.topics['sensor_data']:
-                self._process_sensor_data(payload)
-            elif topic == self.config.topics['status']:
-                self._process_status_update(payload)
-            elif topic == self.config.topics['config']:
-                self._process_config_update(payload)
+            handler = self._topic_handlers.get(topic)
+            if handler is not None:
+                handler(payload)
             
             # Call registered callback if exists
             if topic in self.callbacks:
                 self.callbacks[topic](payload)
             
-            logger.debug(f"Processed message on topic {topic}")
+            logger.debug("Processed message on topic %s", topic)
         except Exception as e:
-            logger.error(f"Error processing message: {str(e)}")
+            logger.error("Error processing message: %s", e)
     
     def _process_sensor_data(self, payload: Dict[str, Any]):
         """Process incoming sensor data."""
@@ -150,41 +236,54 @@ class TCASMQTTServer:
             
             # Store latest sensor data
             self.latest_sensor_data[aircraft_id] = sensor_data
+            self.latest_sensor_data.move_to_end(aircraft_id)
+            if len(self.latest_sensor_data) > self.config.max_tracked_aircraft:
+                self.latest_sensor_data.popitem(last=False)
             
             # Process collision risks if we have data for multiple aircraft
             if len(self.latest_sensor_data) >= 2:
-                self._process_collision_risks()
+                self._process_collision_risks(aircraft_id)
             
-            logger.info(f"Processed sensor data for aircraft {aircraft_id}")
+            logger.info("Processed sensor data for aircraft %s", aircraft_id)
             
         except Exception as e:
-            logger.error(f"Error processing sensor data: {str(e)}")
+            logger.error("Error processing sensor data: %s", e)
     
-    def _process_collision_risks(self):
-        """Process collision risks between aircraft."""
+    def _process_collision_risks(self, updated_id: str):
+        """
+        Process collision risks between the aircraft that just updated and every other
+        tracked aircraft; pairs without it were already alerted on by earlier updates.
+        """
         try:
-            # Get the two most recent aircraft
-            aircraft_ids = list(self.latest_sensor_data.keys())[-2:]
-            ownship_id = aircraft_ids[0]
-            intruder_id = aircraft_ids[1]
+            aircraft_ids = list(self.latest_sensor_data.keys())
             
-            # Get sensor data
-            ownship_data = self.latest_sensor_data[ownship_id]
-            intruder_data = self.latest_sensor_data[intruder_id]
-            
-            # Detect collision risks
-            risk_assessment = self.predictor.detect_collision_risk(ownship_data, intruder_data)
+            # Detect collision risks for the updated aircraft's pairs at once,
+            # skipping pairs that stay clear unless INFO alerts are wanted
+            pair_assessments = self.predictor.assess_all_pairs(
+                list(self.latest_sensor_data.values()),
+                max_separation=None if self.config.info_alerts else self.predictor.risk_thresholds['low'],
+                involving=len(aircraft_ids) - 1  # The updated aircraft was moved to the end
+            )
             
-            # Generate alert
-            alert = self.predictor.generate_alert(risk_assessment)
+            alerts = []
+            for first, second, risk_assessment in pair_assessments:
+                # Generate alert for the pair
+                alert = self.predictor.generate_alert(risk_assessment)
+                alert['aircraft_ids'] = [aircraft_ids[first], aircraft_ids[second]]
+                alerts.append(alert)
             
-            # Publish alert
-            self._publish_alert(alert)
+            # Publish alerts
+            if self.config.batch_alerts and len(alerts) > 1:
+                self._publish_alerts_batch(alerts)
+            else:
+                for alert in alerts:
+                    self._publish_alert(alert)
             
-            logger.info(f"Processed collision risk between {ownship_id} and {intruder_id}")
+            logger.info("Processed collision risks between %s and %d aircraft, %d alerts",
+                        updated_id, len(aircraft_ids) - 1, len(alerts))
             
         except Exception as e:
-            logger.error(f"Error processing collision risks: {str(e)}")
+            logger.error("Error processing collision risks: %s", e)
     
     def _process_status_update(self, payload: Dict[str, Any]):
         """Process status updates."""
@@ -192,19 +291,19 @@ class TCASMQTTServer:
             aircraft_id = payload.get('aircraft_id', 'unknown')
             status = payload.get('status', {})
             
-            logger.info(f"Received status update for aircraft {aircraft_id}: {status}")
+            logger.info("Received status update for aircraft %s: %s", aircraft_id, status)
             
         except Exception as e:
-            logger.error(f"Error processing status update: {str(e)}")
+            logger.error("Error processing status update: %s", e)
     
     def _process_config_update(self, payload: Dict[str, Any]):
         """Process configuration updates."""
         try:
             # Update system configuration based on payload
-            logger.info(f"Received configuration update: {payload}")
+            logger.info("Received configuration update: %s", payload)
             
         except Exception as e:
-            logger.error(f"Error processing configuration update: {str(e)}")
+            logger.error("Error processing configuration update: %s", e)
     
     def _publish_alert(self, alert: Dict[str, Any]):
         """Publish alert to MQTT broker."""
@@ -215,19 +314,46 @@ class TCASMQTTServer:
         try:
             result = self.client.publish(
                 self.config.topics['alerts'],
-                json.dumps(alert),
-                qos=self.qos_levels['alerts']
+                encode(alert, self.config.payload_format),
+                qos=self.alert_qos_levels.get(alert.get('level'), self.qos_levels['alerts']),
+                properties=self._alert_properties
+            )
+            
+            if result.rc == mqtt.MQTT_ERR_SUCCESS:
+                logger.info("Published alert: %s", alert.get('message', 'No message'))
+                return True
+            else:
+                logger.error("Failed to publish alert: %s", result.rc)
+                return False
+                
+        except Exception as e:
+            logger.error("Error publishing alert: %s", e)
+            return False
+    
+    def _publish_alerts_batch(self, alerts: List[Dict[str, Any]]):
+        """Publish several alerts as a single list payload, at the QoS of the most urgent one."""
+        if not self.connected:
+            logger.warning("Not connected to MQTT broker")
+            return False
+        
+        try:
+            qos = max(self.alert_qos_levels.get(alert.get('level'), self.qos_levels['alerts']) for alert in alerts)
+            result = self.client.publish(
+                self.config.topics['alerts'],
+                encode(alerts, self.config.payload_format),
+                qos=qos,
+                properties=self._alert_properties
             )
             
             if result.rc == mqtt.MQTT_ERR_SUCCESS:
-                logger.info(f"Published alert: {alert.get('message', 'No message')}")
+                logger.info("Published batch of %d alerts", len(alerts))
                 return True
             else:
-                logger.error(f"Failed to publish alert: {result.rc}")
+                logger.error("Failed to publish alert batch: %s", result.rc)
                 return False
                 
         except Exception as e:
-            logger.error(f"Error publishing alert: {str(e)}")
+            logger.error("Error publishing alert batch: %s", e)
             return False
     
     def register_callback(self, topic: str, callback: Callable):
@@ -1,16 +1,34 @@
+from bisect import bisect_right
 import numpy as np
-from typing import List, Dict, Tuple, Any
+from typing import List, Dict, Tuple, Any, Optional, Sequence
 from dataclasses import dataclass
-from .data_processor import SensorData
+from ._levels import RiskLevel
+from ._jit_core import closest_approach
+from .data_processor import SensorData, _heading_velocity
 
-@dataclass
+# Column order of the per-step risk factor arrays
+RISK_FACTOR_NAMES = ('speed_factor', 'altitude_factor', 'proximity_factor')
+
+# Alert level, message template, urgency and recommended action per risk level
+_ALERT_TEMPLATES = {
+    RiskLevel.CRITICAL: ("RA", "RESOLUTION ADVISORY! Critical separation: {separation:.1f}m in {time:.1f}s",
+                         "CRITICAL", "IMMEDIATE EVASIVE ACTION REQUIRED"),
+    RiskLevel.HIGH: ("TA", "TRAFFIC ALERT! Minimum separation: {separation:.1f}m in {time:.1f}s",
+                     "HIGH", "PREPARE FOR EVASIVE ACTION"),
+    RiskLevel.MEDIUM: ("ADVISORY", "Traffic advisory: Separation: {separation:.1f}m in {time:.1f}s",
+                       "MEDIUM", "MONITOR AND MAINTAIN SEPARATION")
+}
+_INFO_ALERT = ("INFO", "Traffic information: Separation: {separation:.1f}m in {time:.1f}s",
+               "LOW", "CONTINUE MONITORING")
+
+@dataclass(slots=True)
 class Trajectory:
-    """Container for object trajectory data."""
-    positions: List[Tuple[float, float, float]]  # x, y, z coordinates
-    velocities: List[Tuple[float, float, float]]  # vx, vy, vz
-    timestamps: List[float]
-    confidence_scores: List[float] = None
-    risk_factors: List[Dict[str, float]] = None
+    """Container for object trajectory data, one row or element per time step."""
+    positions: np.ndarray  # (T, 3) x, y, z coordinates
+    velocities: np.ndarray  # (T, 3) vx, vy, vz
+    timestamps: np.ndarray  # (T,)
+    confidence_scores: np.ndarray = None  # (T,)
+    risk_factors: np.ndarray = None  # (T, 3) values in RISK_FACTOR_NAMES order
 
 class CollisionPredictor:
     def __init__(self, prediction_window: float = 60.0):
@@ -27,112 +45,168 @@ class CollisionPredictor:
             'medium': 1000,   # meters
             'low': 2000       # meters
         }
+        # Sorted separation thresholds, CRITICAL bound first
+        self._separation_bounds = tuple(sorted(self.risk_thresholds.values()))
         self.velocity_thresholds = {
             'high': 400,      # knots
             'medium': 250,    # knots
             'low': 100        # knots
         }
+        # Threshold values read on every assessment, kept as plain floats
+        self._clear_separation = float(self.risk_thresholds['low'])
+        self._full_risk_speed = float(self.velocity_thresholds['high'])
+        
+        # Time tables per (prediction_window, time_steps), see _step_times
+        self._step_tables: Dict[Tuple[float, int], Tuple[np.ndarray, np.ndarray, np.ndarray]] = {}
+        self._step_times(60)
+        
+        # Compile (or load from cache) the closest-approach kernel now, not on the first message
+        closest_approach(np.zeros(3), np.zeros(3), np.zeros(3), np.zeros(3), prediction_window, 60)
         
+    def _step_times(self, time_steps: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Read-only per-step time tables, built once per prediction window and step count.
+        Returns: (timestamps, step_end_times, time_factors) where each step is timestamped
+        at its start, positioned at its end, and weighted by the confidence decay factor
+        """
+        key = (self.prediction_window, time_steps)
+        tables = self._step_tables.get(key)
+        if tables is None:
+            dt = self.prediction_window / time_steps
+            timestamps = np.arange(time_steps) * dt
+            tables = (timestamps, timestamps + dt, 1.0 - timestamps / self.prediction_window)
+            for table in tables:
+                table.setflags(write=False)
+            self._step_tables[key] = tables
+        return tables
+    
     def predict_trajectory(self, 
                          current_position: Tuple[float, float, float],
                          current_velocity: Tuple[float, float, float],
                          time_steps: int = 60,
                          confidence: float = 1.0) -> Trajectory:
         """Predict future trajectory based on current state with confidence scoring."""
-        positions = []
-        velocities = []
-        timestamps = []
-        confidence_scores = []
-        risk_factors = []
-        
-        # Current state
-        pos = np.array(current_position)
-        vel = np.array(current_velocity)
-        t = 0.0
+        pos = np.asarray(current_position, dtype=float)
+        vel = np.asarray(current_velocity, dtype=float)
+        timestamps, step_end_times, time_factors = self._step_times(time_steps)
         
-        # Predict future positions
-        for _ in range(time_steps):
-            # Simple constant velocity model with confidence decay
-            pos = pos + vel * (self.prediction_window / time_steps)
-            
-            # Calculate confidence decay based on time
-            time_factor = 1.0 - (t / self.prediction_window)
-            current_confidence = confidence * time_factor
-            
-            # Calculate risk factors
-            current_risk = self._calculate_risk_factors(pos, vel)
-            
-            positions.append(tuple(pos))
-            velocities.append(tuple(vel))
-            timestamps.append(t)
-            confidence_scores.append(current_confidence)
-            risk_factors.append(current_risk)
-            
-            t += self.prediction_window / time_steps
+        # Simple constant velocity model with confidence decay
+        positions = pos + np.outer(step_end_times, vel)
+        confidence_scores = confidence * time_factors
         
         return Trajectory(
             positions=positions,
-            velocities=velocities,
+            velocities=np.broadcast_to(vel, positions.shape),
             timestamps=timestamps,
             confidence_scores=confidence_scores,
-            risk_factors=risk_factors
+            risk_factors=self._calculate_risk_factors(positions, np.linalg.norm(vel))
         )
     
-    def _calculate_risk_factors(self, position: np.ndarray, velocity: np.ndarray) -> Dict[str, float]:
-        """Calculate various risk factors for a given position and velocity."""
-        speed = np.linalg.norm(velocity)
+    def _calculate_risk_factors(self, positions: np.ndarray, speed: float) -> np.ndarray:
+        """Calculate a (T, 3) array of risk factors for (T, 3) positions flown at a given speed."""
+        factors = np.empty((len(positions), 3))
+        factors[:, 0] = min(speed / self._full_risk_speed, 1.0)
+        factors[:, 1] = 1.0 - (positions[:, 2] / 50000)  # Normalize by typical max altitude
+        factors[:, 2] = 1.0 - (np.linalg.norm(positions, axis=1) / 5000)  # Normalize by typical max range
+        return factors
+    
+    def calculate_separation(self, 
+                           traj1: Trajectory,
+                           traj2: Trajectory) -> Dict[str, Any]:
+        """
+        Calculate separation distances and risk metrics between two trajectories.
+        Returns a dictionary of per-step arrays: distance, confidence, timestamp
+        and a dictionary of combined risk_factors.
+        """
+        # Euclidean distance at every step, as horizontal then vertical hypot
+        diff = traj1.positions - traj2.positions
         
         return {
-            'speed_factor': min(speed / self.velocity_thresholds['high'], 1.0),
-            'altitude_factor': 1.0 - (position[2] / 50000),  # Normalize by typical max altitude
-            'proximity_factor': 1.0 - (np.linalg.norm(position) / 5000)  # Normalize by typical max range
+            'distance': np.hypot(np.hypot(diff[:, 0], diff[:, 1]), diff[:, 2]),
+            'risk_factors': self._risk_factor_dict(*self._combine_risk_factors(traj1.risk_factors, traj2.risk_factors)),
+            'confidence': np.minimum(traj1.confidence_scores, traj2.confidence_scores),
+            'timestamp': traj1.timestamps
         }
     
-    def calculate_separation(self, 
-                           traj1: Trajectory,
-                           traj2: Trajectory) -> List[Dict[str, Any]]:
-        """Calculate separation distances and risk metrics between two trajectories."""
-        separations = []
+    def _combine_risk_factors(self, risk1: np.ndarray, risk2: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Combine (T, 3) risk factors from two objects, elementwise over time steps.
+        Returns the (T, 3) worst factors and the (T,) mean of all six factors.
+        """
+        return np.maximum(risk1, risk2), (risk1.sum(axis=-1) + risk2.sum(axis=-1)) / 6
+    
+    @staticmethod
+    def _risk_factor_dict(combined: np.ndarray, combined_risk: np.ndarray) -> Dict[str, Any]:
+        """Name the combined risk factors for output, by the last axis of combined."""
+        risk_factors = dict(zip(RISK_FACTOR_NAMES, np.moveaxis(combined, -1, 0)))
+        risk_factors['combined_risk'] = combined_risk
+        return risk_factors
+    
+    def is_clear_of_conflict(self, own_transponder: Dict, intruder_transponder: Dict) -> bool:
+        """
+        Cheap pre-check on raw transponder data.
+        Returns True if the aircraft cannot come within the lowest risk
+        threshold during the prediction window, even when flying head-on.
+        """
+        own_position = own_transponder.get('position', {})
+        intruder_position = intruder_transponder.get('position', {})
+        dx = own_position.get('lat', 0) - intruder_position.get('lat', 0)
+        dy = own_position.get('lon', 0) - intruder_position.get('lon', 0)
+        dz = own_transponder.get('altitude', 0) - intruder_transponder.get('altitude', 0)
         
-        for i, (pos1, pos2) in enumerate(zip(traj1.positions, traj2.positions)):
-            # Calculate Euclidean distance
-            dist = np.sqrt(sum((p1 - p2) ** 2 for p1, p2 in zip(pos1, pos2)))
-            
-            # Combine risk factors
-            combined_risk = self._combine_risk_factors(
-                traj1.risk_factors[i],
-                traj2.risk_factors[i]
-            )
-            
-            # Calculate confidence in separation prediction
-            confidence = min(
-                traj1.confidence_scores[i],
-                traj2.confidence_scores[i]
-            )
-            
-            separations.append({
-                'distance': dist,
-                'risk_factors': combined_risk,
-                'confidence': confidence,
-                'timestamp': traj1.timestamps[i]
-            })
+        # Largest distance the aircraft can close within the prediction window
+        closing = self.prediction_window * (abs(own_transponder.get('speed', 0)) +
+                                            abs(intruder_transponder.get('speed', 0)))
+        safe_distance = self._clear_separation + closing
         
-        return separations
+        return dx * dx + dy * dy + dz * dz > safe_distance * safe_distance
+    
+    def assess_clear_of_conflict(self, own_transponder: Dict, intruder_transponder: Dict) -> Dict:
+        """
+        Risk assessment straight from raw transponder data, for pairs that
+        is_clear_of_conflict has already ruled out.
+        Returns the same dictionary detect_collision_risk returns for a clear pair.
+        """
+        own_position = own_transponder.get('position', {})
+        intruder_position = intruder_transponder.get('position', {})
+        own_pos = np.array([own_position.get('lat', 0), own_position.get('lon', 0),
+                            own_transponder.get('altitude', 0)], dtype=float)
+        intruder_pos = np.array([intruder_position.get('lat', 0), intruder_position.get('lon', 0),
+                                 intruder_transponder.get('altitude', 0)], dtype=float)
+        own_vel = np.array(_heading_velocity(own_transponder.get('speed', 0), own_transponder.get('heading', 0)))
+        intruder_vel = np.array(_heading_velocity(intruder_transponder.get('speed', 0),
+                                                  intruder_transponder.get('heading', 0)))
+        # No classification on this path, so full confidence as in _state_vectors
+        return self._clear_assessment(own_pos, own_vel, 1.0, intruder_pos, intruder_vel, 1.0)
     
-    def _combine_risk_factors(self, risk1: Dict[str, float], risk2: Dict[str, float]) -> Dict[str, float]:
-        """Combine risk factors from two objects."""
+    def _clear_assessment(self,
+                          own_pos: np.ndarray, own_vel: np.ndarray, own_conf: float,
+                          intruder_pos: np.ndarray, intruder_vel: np.ndarray, intr_conf: float) -> Optional[Dict]:
+        """
+        NONE risk assessment at the closest point of approach, or None if the pair may come within
+        the lowest risk threshold and needs the per-step prediction.
+        """
+        # Analytic closest point of approach within the window; it bounds the
+        # per-step minimum from below, so a clear result here is a clear result there
+        rel_pos = intruder_pos - own_pos
+        rel_vel = intruder_vel - own_vel
+        vv = rel_vel @ rel_vel
+        t_cpa = 0.0 if vv < 1e-6 else min(max(-(rel_pos @ rel_vel) / vv, 0.0), self.prediction_window)
+        cpa_distance = float(np.linalg.norm(rel_pos + rel_vel * t_cpa))
+        if cpa_distance <= self._clear_separation:
+            return None
+        combined, combined_risk = self._combine_risk_factors(
+            self._calculate_risk_factors((own_pos + own_vel * t_cpa)[np.newaxis], np.linalg.norm(own_vel)),
+            self._calculate_risk_factors((intruder_pos + intruder_vel * t_cpa)[np.newaxis], np.linalg.norm(intruder_vel))
+        )
         return {
-            'speed_factor': max(risk1['speed_factor'], risk2['speed_factor']),
-            'altitude_factor': max(risk1['altitude_factor'], risk2['altitude_factor']),
-            'proximity_factor': max(risk1['proximity_factor'], risk2['proximity_factor']),
-            'combined_risk': np.mean([
-                risk1['speed_factor'],
-                risk1['altitude_factor'],
-                risk1['proximity_factor'],
-                risk2['speed_factor'],
-                risk2['altitude_factor'],
-                risk2['proximity_factor']
-            ])
+            "risk_level": RiskLevel.NONE,
+            "min_separation": cpa_distance,
+            "time_to_closest": t_cpa,
+            "confidence": min(own_conf, intr_conf) * (1.0 - t_cpa / self.prediction_window),
+            "risk_factors": self._risk_factor_dict(combined[0], combined_risk[0]),
+            "predicted_trajectories": None,
+            "separation_history": None
         }
     
     def detect_collision_risk(self,
@@ -140,36 +214,17 @@ class CollisionPredictor:
                             intruder_data: SensorData) -> Dict:
         """
         Detect potential collision risks between ownship and intruder.
-        Returns: Dictionary with risk assessment and prediction details
+        Returns: Dictionary with risk assessment and prediction details;
+        predicted_trajectories and separation_history are None for pairs that stay clear
         """
-        # Extract current positions and velocities
-        own_pos = (
-            ownship_data.transponder_data['position']['lat'],
-            ownship_data.transponder_data['position']['lon'],
-            ownship_data.transponder_data['altitude']
-        )
-        
-        own_vel = (
-            ownship_data.transponder_data['speed'] * np.cos(np.radians(ownship_data.transponder_data['heading'])),
-            ownship_data.transponder_data['speed'] * np.sin(np.radians(ownship_data.transponder_data['heading'])),
-            0  # Assuming constant altitude for simplicity
-        )
-        
-        intruder_pos = (
-            intruder_data.transponder_data['position']['lat'],
-            intruder_data.transponder_data['position']['lon'],
-            intruder_data.transponder_data['altitude']
-        )
-        
-        intruder_vel = (
-            intruder_data.transponder_data['speed'] * np.cos(np.radians(intruder_data.transponder_data['heading'])),
-            intruder_data.transponder_data['speed'] * np.sin(np.radians(intruder_data.transponder_data['heading'])),
-            0
-        )
+        # Extract current positions, velocities and classification confidences
+        own_pos, own_vel, own_conf = self._state_vectors(ownship_data)
+        intruder_pos, intruder_vel, intr_conf = self._state_vectors(intruder_data)
         
-        # Get confidence scores from classification
-        own_conf = ownship_data.additional_features.get('classification_confidence', 1.0)
-        intr_conf = intruder_data.additional_features.get('classification_confidence', 1.0)
+        clear_assessment = self._clear_assessment(own_pos, own_vel, own_conf,
+                                                  intruder_pos, intruder_vel, intr_conf)
+        if clear_assessment is not None:
+            return clear_assessment
         
         # Predict trajectories
         own_trajectory = self.predict_trajectory(own_pos, own_vel, confidence=own_conf)
@@ -179,8 +234,13 @@ class CollisionPredictor:
         separations = self.calculate_separation(own_trajectory, intruder_trajectory)
         
         # Find minimum separation and associated metrics
-        min_sep_idx = min(range(len(separations)), key=lambda i: separations[i]['distance'])
-        min_separation = separations[min_sep_idx]
+        min_sep_idx = np.argmin(separations['distance'])
+        min_separation = {
+            'distance': separations['distance'][min_sep_idx],
+            'risk_factors': {name: values[min_sep_idx] for name, values in separations['risk_factors'].items()},
+            'confidence': separations['confidence'][min_sep_idx],
+            'timestamp': separations['timestamp'][min_sep_idx]
+        }
         
         # Determine risk level
         risk_level = self._determine_risk_level(min_separation['distance'])
@@ -198,60 +258,118 @@ class CollisionPredictor:
             "separation_history": separations
         }
     
-    def _determine_risk_level(self, separation: float) -> str:
+    def assess_closest_approach(self,
+                                ownship_data: SensorData,
+                                intruder_data: SensorData,
+                                time_steps: int = 60) -> Dict:
+        """
+        Compiled fast path of detect_collision_risk for callers that only need the alert inputs.
+        Returns the same risk assessment without predicted_trajectories and separation_history.
+        """
+        own_state = self._state_vectors(ownship_data)
+        intruder_state = self._state_vectors(intruder_data)
+        
+        # Search for the closest step without building the trajectories
+        index, distance = closest_approach(own_state[0], own_state[1], intruder_state[0], intruder_state[1],
+                                           float(self.prediction_window), time_steps)
+        
+        return self._assessment_at_step(own_state, intruder_state, index, distance, time_steps)
+    
+    def assess_all_pairs(self,
+                         sensor_data: Sequence[SensorData],
+                         time_steps: int = 60,
+                         max_separation: Optional[float] = None,
+                         involving: Optional[int] = None) -> List[Tuple[int, int, Dict]]:
+        """
+        Assess the closest approach of every pair of tracked objects in one batched pass.
+        Only pairs whose minimum separation is below max_separation are assessed, if given,
+        and only pairs that include the object at index involving, if given.
+        Returns: list of (index_a, index_b, risk_assessment) with index_a < index_b,
+        each assessment as returned by assess_closest_approach
+        """
+        if len(sensor_data) < 2:
+            return []
+        states = [self._state_vectors(data) for data in sensor_data]
+        positions = np.array([state[0] for state in states])
+        velocities = np.array([state[1] for state in states])
+        
+        # (N, T, 3) positions of every object at the end of every step
+        t = self._step_times(time_steps)[1]
+        tracks = positions[:, np.newaxis, :] + velocities[:, np.newaxis, :] * t[np.newaxis, :, np.newaxis]
+        
+        # (P, T) separations of each distinct pair, then each pair's closest step
+        if involving is None:
+            first, second = np.triu_indices(len(sensor_data), 1)
+        else:
+            others = np.delete(np.arange(len(sensor_data)), involving)
+            first, second = np.minimum(others, involving), np.maximum(others, involving)
+        diff = tracks[first] - tracks[second]
+        separations = np.hypot(np.hypot(diff[..., 0], diff[..., 1]), diff[..., 2])
+        closest = separations.argmin(axis=1)
+        distances = separations[np.arange(len(closest)), closest]
+        
+        selected = range(len(closest)) if max_separation is None else np.flatnonzero(distances < max_separation)
+        return [
+            (int(first[p]), int(second[p]),
+             self._assessment_at_step(states[first[p]], states[second[p]], int(closest[p]), distances[p], time_steps))
+            for p in selected
+        ]
+    
+    def _assessment_at_step(self,
+                            own_state: Tuple[np.ndarray, np.ndarray, float],
+                            intruder_state: Tuple[np.ndarray, np.ndarray, float],
+                            index: int,
+                            distance: float,
+                            time_steps: int) -> Dict:
+        """Build the risk assessment for two tracks at their closest step."""
+        own_pos, own_vel, own_conf = own_state
+        intruder_pos, intruder_vel, intr_conf = intruder_state
+        
+        # Metrics at the closest step, computed as predict_trajectory does for every step
+        dt = self.prediction_window / time_steps
+        timestamp = index * dt
+        combined, combined_risk = self._combine_risk_factors(
+            self._calculate_risk_factors((own_pos + own_vel * (timestamp + dt))[np.newaxis], np.linalg.norm(own_vel)),
+            self._calculate_risk_factors((intruder_pos + intruder_vel * (timestamp + dt))[np.newaxis], np.linalg.norm(intruder_vel))
+        )
+        
+        return {
+            "risk_level": self._determine_risk_level(distance),
+            "min_separation": distance,
+            "time_to_closest": timestamp,
+            "confidence": min(own_conf, intr_conf) * (1.0 - timestamp / self.prediction_window),
+            "risk_factors": self._risk_factor_dict(combined[0], combined_risk[0])
+        }
+    
+    @staticmethod
+    def _state_vectors(sensor_data: SensorData) -> Tuple[np.ndarray, np.ndarray, float]:
+        """Position, velocity and classification confidence of a tracked object."""
+        transponder = sensor_data.transponder_data
+        position = np.array([
+            transponder['position']['lat'],
+            transponder['position']['lon'],
+            transponder['altitude']
+        ], dtype=float)
+        # Level flight assumed, as in SensorData.velocity
+        velocity = np.array(sensor_data.velocity)
+        confidence = sensor_data.additional_features.get('classification_confidence', 1.0)
+        return position, velocity, confidence
+    
+    def _determine_risk_level(self, separation: float) -> RiskLevel:
         """Determine risk level based on separation distance."""
-        if separation < self.risk_thresholds['critical']:
-            return "CRITICAL"
-        elif separation < self.risk_thresholds['high']:
-            return "HIGH"
-        elif separation < self.risk_thresholds['medium']:
-            return "MEDIUM"
-        elif separation < self.risk_thresholds['low']:
-            return "LOW"
-        return "NONE"
+        # Each threshold the separation reaches lowers the level by one, CRITICAL to NONE
+        return RiskLevel(RiskLevel.CRITICAL - bisect_right(self._separation_bounds, separation))
     
     def generate_alert(self, risk_assessment: Dict) -> Dict:
         """Generate appropriate alert based on risk assessment."""
-        risk_level = risk_assessment["risk_level"]
-        min_separation = risk_assessment["min_separation"]
-        time_to_closest = risk_assessment["time_to_closest"]
-        confidence = risk_assessment["confidence"]
-        risk_factors = risk_assessment["risk_factors"]
-        
-        # Generate alert based on risk level and factors
-        if risk_level == "CRITICAL":
-            return {
-                "level": "RA",
-                "message": f"RESOLUTION ADVISORY! Critical separation: {min_separation:.1f}m in {time_to_closest:.1f}s",
-                "urgency": "CRITICAL",
-                "recommended_action": "IMMEDIATE EVASIVE ACTION REQUIRED",
-                "confidence": confidence,
-                "risk_factors": risk_factors
-            }
-        elif risk_level == "HIGH":
-            return {
-                "level": "TA",
-                "message": f"TRAFFIC ALERT! Minimum separation: {min_separation:.1f}m in {time_to_closest:.1f}s",
-                "urgency": "HIGH",
-                "recommended_action": "PREPARE FOR EVASIVE ACTION",
-                "confidence": confidence,
-                "risk_factors": risk_factors
-            }
-        elif risk_level == "MEDIUM":
-            return {
-                "level": "ADVISORY",
-                "message": f"Traffic advisory: Separation: {min_separation:.1f}m in {time_to_closest:.1f}s",
-                "urgency": "MEDIUM",
-                "recommended_action": "MONITOR AND MAINTAIN SEPARATION",
-                "confidence": confidence,
-                "risk_factors": risk_factors
-            }
-        else:
-            return {
-                "level": "INFO",
-                "message": f"Traffic information: Separation: {min_separation:.1f}m in {time_to_closest:.1f}s",
-                "urgency": "LOW",
-                "recommended_action": "CONTINUE MONITORING",
-                "confidence": confidence,
-                "risk_factors": risk_factors
-            } 
\ No newline at end of file
+        # Alert text by risk level; LOW and NONE fall back to traffic information
+        level, message, urgency, action = _ALERT_TEMPLATES.get(risk_assessment["risk_level"], _INFO_ALERT)
+        return {
+            "level": level,
+            "message": message.format(separation=risk_assessment["min_separation"],
+                                      time=risk_assessment["time_to_closest"]),
+            "urgency": urgency,
+            "recommended_action": action,
+            "confidence": risk_assessment["confidence"],
+            "risk_factors": risk_assessment["risk_factors"]
+        } 
\ No newline at end of file
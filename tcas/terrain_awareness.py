@@ -1,8 +1,10 @@
-from typing import Dict, List, Optional, Tuple
+from bisect import bisect_left, bisect_right
+from typing import Dict, List, Optional, Tuple, Union
 import numpy as np
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+from ._levels import RiskLevel
 
-@dataclass
+@dataclass(slots=True)
 class TerrainData:
     """Container for terrain-related data."""
     aircraft_altitude: float  # in feet
@@ -11,8 +13,64 @@ class TerrainData:
     distance_to_terrain: float  # in meters
     terrain_type: str  # e.g., 'mountain', 'valley', 'plateau'
     terrain_roughness: float  # 0-1 scale
-    terrain_obstacles: List[Dict[str, float]]  # List of obstacles with their positions and heights
+    terrain_obstacles: Union[List[Dict[str, float]], np.ndarray]  # Obstacle dicts, or an (N, 2) array of distance, height
     terrain_clearance: float  # in feet
+    # (N, 2) array of obstacle distance and height, built from terrain_obstacles
+    obstacle_array: np.ndarray = field(init=False, repr=False)
+
+    def __post_init__(self):
+        if isinstance(self.terrain_obstacles, np.ndarray):
+            self.obstacle_array = self.terrain_obstacles.reshape(-1, 2).astype(float, copy=False)
+        else:
+            self.obstacle_array = np.array(
+                [(obstacle['distance'], obstacle['height']) for obstacle in self.terrain_obstacles],
+                dtype=float
+            ).reshape(-1, 2)
+
+    @classmethod
+    def from_dict(cls, raw_data: Dict) -> 'TerrainData':
+        """Build terrain data from a raw terrain dictionary, filling in defaults."""
+        return cls(*(raw_data.get(name, default) for name, default in TERRAIN_FIELDS))
+
+# Terrain fields with their defaults, in TerrainData field order
+TERRAIN_FIELDS = (
+    ('aircraft_altitude', 0),
+    ('terrain_elevation', 0),
+    ('terrain_slope', 0),
+    ('distance_to_terrain', 10000),
+    ('terrain_type', 'unknown'),
+    ('terrain_roughness', 0),
+    ('terrain_obstacles', ()),
+    ('terrain_clearance', 10000)
+)
+
+# Risk scores per band, from below the lowest threshold to above the highest
+_DESCENDING_SCORES = (1.0, 0.8, 0.6, 0.4, 0.2)
+_ASCENDING_SCORES = (0.2, 0.4, 0.6, 0.8, 1.0)
+
+# Lower bounds of the LOW, MEDIUM, HIGH and CRITICAL combined-risk bands
+_RISK_LEVEL_BOUNDS = (0.2, 0.4, 0.6, 0.8)
+
+# Recommendations per risk factor as (threshold, text) bands, most severe first
+_FACTOR_RECOMMENDATIONS = (
+    ('clearance', ((0.8, "IMMEDIATE CLIMB REQUIRED - Critical terrain clearance"),
+                   (0.6, "Maintain increased altitude - Low terrain clearance"))),
+    ('slope', ((0.8, "Avoid steep terrain areas - Critical slope detected"),
+               (0.6, "Exercise caution - Significant terrain slope"))),
+    ('roughness', ((0.8, "Maintain increased separation - Rough terrain"),
+                   (0.6, "Exercise caution - Moderate terrain roughness"))),
+    ('obstacles', ((0.8, "Multiple obstacles detected - Maintain maximum clearance"),
+                   (0.6, "Obstacles present - Maintain increased separation")))
+)
+_TERRAIN_TYPE_RECOMMENDATIONS = {
+    'mountain': "Mountainous terrain - Maintain increased vigilance",
+    'valley': "Valley terrain - Monitor terrain clearance"
+}
+_RISK_LEVEL_RECOMMENDATIONS = {
+    RiskLevel.CRITICAL: "TERRAIN TERRAIN PULL UP - Immediate action required",
+    RiskLevel.HIGH: "Increase terrain clearance and prepare for possible diversion",
+    RiskLevel.MEDIUM: "Monitor terrain proximity and maintain safe clearance"
+}
 
 class TerrainAwarenessSystem:
     def __init__(self):
@@ -36,6 +94,11 @@ class TerrainAwarenessSystem:
             'low': 0.2
         }
         
+        # Sorted threshold tables for the bisect lookups below
+        self._clearance_bounds = tuple(sorted(self.minimum_terrain_clearance.values()))
+        self._slope_bounds = tuple(sorted(self.slope_thresholds.values()))
+        self._roughness_bounds = tuple(sorted(self.roughness_thresholds.values()))
+        
     def assess_terrain_risk(self, terrain_data: TerrainData) -> Dict:
         """
         Assess terrain-related risks and their impact on collision avoidance.
@@ -45,7 +108,7 @@ class TerrainAwarenessSystem:
         clearance_risk = self._calculate_clearance_risk(terrain_data.terrain_clearance)
         slope_risk = self._calculate_slope_risk(terrain_data.terrain_slope)
         roughness_risk = self._calculate_roughness_risk(terrain_data.terrain_roughness)
-        obstacle_risk = self._calculate_obstacle_risk(terrain_data.terrain_obstacles)
+        obstacle_risk = self._calculate_obstacle_risk(terrain_data.obstacle_array)
         
         # Calculate combined risk score
         risk_factors = {
@@ -79,111 +142,60 @@ class TerrainAwarenessSystem:
     
     def _calculate_clearance_risk(self, clearance: float) -> float:
         """Calculate risk factor based on terrain clearance."""
-        if clearance < self.minimum_terrain_clearance['critical']:
-            return 1.0
-        elif clearance < self.minimum_terrain_clearance['high']:
-            return 0.8
-        elif clearance < self.minimum_terrain_clearance['medium']:
-            return 0.6
-        elif clearance < self.minimum_terrain_clearance['low']:
-            return 0.4
-        return 0.2
+        # Risk rises as clearance falls below each threshold
+        return _DESCENDING_SCORES[bisect_right(self._clearance_bounds, clearance)]
     
     def _calculate_slope_risk(self, slope: float) -> float:
         """Calculate risk factor based on terrain slope."""
-        if slope > self.slope_thresholds['critical']:
-            return 1.0
-        elif slope > self.slope_thresholds['high']:
-            return 0.8
-        elif slope > self.slope_thresholds['medium']:
-            return 0.6
-        elif slope > self.slope_thresholds['low']:
-            return 0.4
-        return 0.2
+        # Risk rises as slope exceeds each threshold
+        return _ASCENDING_SCORES[bisect_left(self._slope_bounds, slope)]
     
     def _calculate_roughness_risk(self, roughness: float) -> float:
         """Calculate risk factor based on terrain roughness."""
-        if roughness > self.roughness_thresholds['critical']:
-            return 1.0
-        elif roughness > self.roughness_thresholds['high']:
-            return 0.8
-        elif roughness > self.roughness_thresholds['medium']:
-            return 0.6
-        elif roughness > self.roughness_thresholds['low']:
-            return 0.4
-        return 0.2
+        # Risk rises as roughness exceeds each threshold
+        return _ASCENDING_SCORES[bisect_left(self._roughness_bounds, roughness)]
     
-    def _calculate_obstacle_risk(self, obstacles: List[Dict[str, float]]) -> float:
-        """Calculate risk factor based on terrain obstacles."""
-        if not obstacles:
+    def _calculate_obstacle_risk(self, obstacles: np.ndarray) -> float:
+        """Calculate risk factor based on an (N, 2) array of obstacle distances and heights."""
+        if len(obstacles) == 0:
             return 0.2
-            
-        # Calculate risk based on number and proximity of obstacles
-        risk_score = 0.0
-        for obstacle in obstacles:
-            # Higher risk for closer obstacles
-            distance_factor = 1.0 - min(obstacle['distance'] / 5000, 1.0)
-            # Higher risk for taller obstacles
-            height_factor = min(obstacle['height'] / 1000, 1.0)
-            risk_score = max(risk_score, (distance_factor + height_factor) / 2)
-            
-        return risk_score
+        
+        # Higher risk for closer obstacles
+        distance_factors = 1.0 - np.minimum(obstacles[:, 0] / 5000, 1.0)
+        # Higher risk for taller obstacles
+        height_factors = np.minimum(obstacles[:, 1] / 1000, 1.0)
+        
+        # Risk of the most dangerous obstacle
+        return max(0.0, float((distance_factors + height_factors).max()) / 2)
     
-    def _determine_risk_level(self, combined_risk: float) -> str:
+    def _determine_risk_level(self, combined_risk: float) -> RiskLevel:
         """Determine overall risk level based on combined risk score."""
-        if combined_risk >= 0.8:
-            return "CRITICAL"
-        elif combined_risk >= 0.6:
-            return "HIGH"
-        elif combined_risk >= 0.4:
-            return "MEDIUM"
-        elif combined_risk >= 0.2:
-            return "LOW"
-        return "NONE"
+        # Band index 0-4 is the RiskLevel value, NONE to CRITICAL
+        return RiskLevel(bisect_right(_RISK_LEVEL_BOUNDS, combined_risk))
     
     def _generate_recommendations(self, 
                                 risk_factors: Dict[str, float], 
-                                risk_level: str,
+                                risk_level: RiskLevel,
                                 terrain_data: TerrainData) -> List[str]:
         """Generate specific recommendations based on risk factors and terrain data."""
         recommendations = []
         
-        # Clearance-based recommendations
-        if risk_factors['clearance'] >= 0.8:
-            recommendations.append("IMMEDIATE CLIMB REQUIRED - Critical terrain clearance")
-        elif risk_factors['clearance'] >= 0.6:
-            recommendations.append("Maintain increased altitude - Low terrain clearance")
-        
-        # Slope-based recommendations
-        if risk_factors['slope'] >= 0.8:
-            recommendations.append("Avoid steep terrain areas - Critical slope detected")
-        elif risk_factors['slope'] >= 0.6:
-            recommendations.append("Exercise caution - Significant terrain slope")
-        
-        # Roughness-based recommendations
-        if risk_factors['roughness'] >= 0.8:
-            recommendations.append("Maintain increased separation - Rough terrain")
-        elif risk_factors['roughness'] >= 0.6:
-            recommendations.append("Exercise caution - Moderate terrain roughness")
-        
-        # Obstacle-based recommendations
-        if risk_factors['obstacles'] >= 0.8:
-            recommendations.append("Multiple obstacles detected - Maintain maximum clearance")
-        elif risk_factors['obstacles'] >= 0.6:
-            recommendations.append("Obstacles present - Maintain increased separation")
+        # Factor-based recommendations, the most severe matching band per factor
+        for factor, bands in _FACTOR_RECOMMENDATIONS:
+            value = risk_factors[factor]
+            for threshold, recommendation in bands:
+                if value >= threshold:
+                    recommendations.append(recommendation)
+                    break
         
         # Terrain type specific recommendations
-        if terrain_data.terrain_type == 'mountain':
-            recommendations.append("Mountainous terrain - Maintain increased vigilance")
-        elif terrain_data.terrain_type == 'valley':
-            recommendations.append("Valley terrain - Monitor terrain clearance")
+        recommendation = _TERRAIN_TYPE_RECOMMENDATIONS.get(terrain_data.terrain_type)
+        if recommendation:
+            recommendations.append(recommendation)
         
         # General recommendations based on risk level
-        if risk_level == "CRITICAL":
-            recommendations.append("TERRAIN TERRAIN PULL UP - Immediate action required")
-        elif risk_level == "HIGH":
-            recommendations.append("Increase terrain clearance and prepare for possible diversion")
-        elif risk_level == "MEDIUM":
-            recommendations.append("Monitor terrain proximity and maintain safe clearance")
+        recommendation = _RISK_LEVEL_RECOMMENDATIONS.get(risk_level)
+        if recommendation:
+            recommendations.append(recommendation)
         
         return recommendations 
\ No newline at end of file
@@ -1,10 +1,14 @@
-from typing import Dict, List, Optional
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict
+from types import MappingProxyType
+from typing import Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple, Union
 import numpy as np
 from dataclasses import dataclass
+from ._levels import RiskLevel
+from ._jit_core import HAVE_NUMBA, weather_risk, weather_risk_batch, RISK_LEVEL_BOUNDS
 
-@dataclass
-class WeatherData:
-    """Container for weather-related data."""
+class WeatherData(NamedTuple):
+    """Container for weather-related data, immutable and hashable by value."""
     visibility: float  # in meters
     precipitation_rate: float  # in mm/hour
     cloud_ceiling: float  # in meters
@@ -14,167 +18,380 @@ class WeatherData:
     icing_potential: float  # 0-1 scale
     lightning_activity: float  # 0-1 scale
 
-class WeatherRiskAssessor:
-    def __init__(self):
-        """Initialize weather risk assessment parameters."""
-        self.visibility_thresholds = {
-            'critical': 1000,  # meters
-            'high': 3000,
-            'medium': 5000,
-            'low': 8000
+@dataclass(slots=True, frozen=True)
+class WeatherRiskResult:
+    """Weather risk assessment for one set of weather conditions."""
+    risk_level: RiskLevel
+    risk_score: float  # Mean of the six risk factors
+    visibility_risk: float
+    precipitation_risk: float
+    wind_risk: float
+    turbulence_risk: float
+    icing_risk: float
+    lightning_risk: float
+    recommendations: Tuple[str, ...]
+    weather: Union[WeatherData, np.record]  # The assessed weather data, referenced rather than copied
+
+    @property
+    def visibility(self) -> float:
+        """Assessed visibility in meters."""
+        return self.weather.visibility
+
+    @property
+    def precipitation(self) -> float:
+        """Assessed precipitation rate in mm/hour."""
+        return self.weather.precipitation_rate
+
+    @property
+    def wind_speed(self) -> float:
+        """Assessed wind speed in knots."""
+        return self.weather.wind_speed
+
+    @property
+    def wind_direction(self) -> float:
+        """Assessed wind direction in degrees."""
+        return self.weather.wind_direction
+
+    @property
+    def cloud_ceiling(self) -> float:
+        """Assessed cloud ceiling in meters."""
+        return self.weather.cloud_ceiling
+
+    @property
+    def risk_factors(self) -> Dict[str, float]:
+        """Risk factors by name."""
+        return {
+            'visibility': self.visibility_risk,
+            'precipitation': self.precipitation_risk,
+            'wind': self.wind_risk,
+            'turbulence': self.turbulence_risk,
+            'icing': self.icing_risk,
+            'lightning': self.lightning_risk
         }
-        self.precipitation_thresholds = {
-            'critical': 10,  # mm/hour
-            'high': 5,
-            'medium': 2,
-            'low': 0.5
+
+    @property
+    def weather_conditions(self) -> Dict[str, float]:
+        """Assessed weather conditions by name."""
+        return {
+            'visibility': self.visibility,
+            'precipitation': self.precipitation,
+            'wind_speed': self.wind_speed,
+            'wind_direction': self.wind_direction,
+            'cloud_ceiling': self.cloud_ceiling
         }
-        self.wind_thresholds = {
-            'critical': 50,  # knots
-            'high': 35,
-            'medium': 25,
-            'low': 15
+
+    def to_dict(self) -> Dict:
+        """The assessment as a nested dictionary of risk factors, recommendations and conditions."""
+        return {
+            'risk_level': self.risk_level,
+            'risk_score': self.risk_score,
+            'risk_factors': self.risk_factors,
+            'recommendations': list(self.recommendations),
+            'weather_conditions': self.weather_conditions
         }
+
+# Weather fields with their defaults, in WEATHER_DTYPE order
+WEATHER_FIELDS = (
+    ('visibility', 10000),
+    ('precipitation_rate', 0),
+    ('cloud_ceiling', 10000),
+    ('wind_speed', 0),
+    ('wind_direction', 0),
+    ('turbulence_index', 0),
+    ('icing_potential', 0),
+    ('lightning_activity', 0)
+)
+
+# Structured record layout for weather data. Fields stay float64 so a record
+# scores exactly like the WeatherData built from the same dictionary
+WEATHER_DTYPE = np.dtype([(name, 'f8') for name, _ in WEATHER_FIELDS])
+
+def weather_record(raw_data: Dict) -> np.record:
+    """Pack a raw weather dictionary into a WEATHER_DTYPE record."""
+    values = tuple(raw_data.get(name, default) for name, default in WEATHER_FIELDS)
+    return np.array(values, dtype=WEATHER_DTYPE).view(np.recarray)[()]
+
+class WeatherDataBatch:
+    """Weather data for many samples, one WEATHER_DTYPE row per sample."""
+    __slots__ = ('data',)
+    
+    def __init__(self, size: int):
+        """Allocate size samples, each set to the WEATHER_FIELDS defaults."""
+        self.data = np.empty(size, dtype=WEATHER_DTYPE).view(np.recarray)
+        self.data[...] = tuple(default for _, default in WEATHER_FIELDS)
+    
+    @classmethod
+    def from_dicts(cls, raw_data: Iterable[Dict]) -> 'WeatherDataBatch':
+        """Pack raw weather dictionaries into a batch, filling in defaults."""
+        rows = [tuple(raw.get(name, default) for name, default in WEATHER_FIELDS) for raw in raw_data]
+        batch = cls(0)
+        batch.data = np.array(rows, dtype=WEATHER_DTYPE).view(np.recarray)
+        return batch
+    
+    def __len__(self) -> int:
+        return len(self.data)
+    
+    def __getitem__(self, index: int) -> np.record:
+        """One sample as a WEATHER_DTYPE record, accepted by assess_weather_risk."""
+        return self.data[index]
+
+def _weather_key(weather_data: Union[WeatherData, np.record]) -> tuple:
+    """All weather values as a hashable tuple, in WEATHER_FIELDS order."""
+    if isinstance(weather_data, np.record):
+        # One call instead of a slow record field access per value
+        return weather_data.item()
+    # WeatherData is itself a tuple of the values
+    return weather_data
+
+# Risk scores per band, from below the lowest threshold to above the highest
+_DESCENDING_SCORES = (1.0, 0.8, 0.6, 0.4, 0.2)
+_ASCENDING_SCORES = (0.2, 0.4, 0.6, 0.8, 1.0)
+_DESCENDING_SCORE_ARRAY = np.array(_DESCENDING_SCORES)
+_ASCENDING_SCORE_ARRAY = np.array(_ASCENDING_SCORES)
+
+# RISK_LEVEL_BOUNDS for np.searchsorted in the batch API
+_RISK_LEVEL_BOUND_ARRAY = np.array(RISK_LEVEL_BOUNDS)
+
+# Lower bounds of the moderate and severe factor bands
+_FACTOR_BAND_BOUNDS = (0.6, 0.8)
+
+# Recommendations per risk factor, indexed by band: below moderate, moderate, severe
+_VISIBILITY_RECOMMENDATIONS = (None,
+                               "Increase separation distances due to reduced visibility",
+                               "Consider alternate routing due to low visibility")
+_PRECIPITATION_RECOMMENDATIONS = (None,
+                                  "Monitor precipitation intensity and adjust speed accordingly",
+                                  "Activate weather radar and maintain increased separation")
+_WIND_RECOMMENDATIONS = (None,
+                         "Adjust speed and heading for wind compensation",
+                         "Consider altitude change due to strong winds")
+_TURBULENCE_RECOMMENDATIONS = (None,
+                               "Maintain increased separation in turbulent conditions",
+                               "Activate turbulence mode and increase separation")
+_ICING_RECOMMENDATIONS = (None,
+                          "Monitor icing conditions and activate anti-ice as needed",
+                          "Activate anti-ice systems and consider altitude change")
+_LIGHTNING_RECOMMENDATIONS = (None,
+                              "Monitor lightning activity and adjust route if necessary",
+                              "Maintain maximum separation from storm cells")
+# In WeatherRiskResult risk factor order
+_FACTOR_RECOMMENDATIONS = (
+    _VISIBILITY_RECOMMENDATIONS,
+    _PRECIPITATION_RECOMMENDATIONS,
+    _WIND_RECOMMENDATIONS,
+    _TURBULENCE_RECOMMENDATIONS,
+    _ICING_RECOMMENDATIONS,
+    _LIGHTNING_RECOMMENDATIONS
+)
+_RISK_LEVEL_RECOMMENDATIONS = {
+    RiskLevel.CRITICAL: "Consider immediate diversion or holding pattern",
+    RiskLevel.HIGH: "Increase situational awareness and prepare for possible diversion",
+    RiskLevel.MEDIUM: "Maintain increased vigilance and monitor weather conditions"
+}
+
+def _bound_array(bounds: Tuple[float, ...]) -> np.ndarray:
+    """Read-only float array of sorted threshold bounds, shared by all assessors."""
+    array = np.array(bounds, dtype=float)
+    array.setflags(write=False)
+    return array
+
+class WeatherRiskAssessor:
+    # Risk thresholds shared by all assessors (read-only; the tables below are built from them,
+    # so override them in a subclass rather than on an instance)
+    visibility_thresholds = MappingProxyType({
+        'critical': 1000,  # meters
+        'high': 3000,
+        'medium': 5000,
+        'low': 8000
+    })
+    precipitation_thresholds = MappingProxyType({
+        'critical': 10,  # mm/hour
+        'high': 5,
+        'medium': 2,
+        'low': 0.5
+    })
+    wind_thresholds = MappingProxyType({
+        'critical': 50,  # knots
+        'high': 35,
+        'medium': 25,
+        'low': 15
+    })
+    
+    # Sorted threshold tables for the bisect lookups below
+    _visibility_bounds = tuple(sorted(visibility_thresholds.values()))
+    _precipitation_bounds = tuple(sorted(precipitation_thresholds.values()))
+    _wind_bounds = tuple(sorted(wind_thresholds.values()))
+    # Float copies of the bounds for the compiled scoring kernel and the batch API
+    _visibility_bound_array = _bound_array(_visibility_bounds)
+    _precipitation_bound_array = _bound_array(_precipitation_bounds)
+    _wind_bound_array = _bound_array(_wind_bounds)
+    
+    def __init_subclass__(cls, **kwargs):
+        """Rebuild the bound tables for subclasses that override the thresholds."""
+        super().__init_subclass__(**kwargs)
+        cls._visibility_bounds = tuple(sorted(cls.visibility_thresholds.values()))
+        cls._precipitation_bounds = tuple(sorted(cls.precipitation_thresholds.values()))
+        cls._wind_bounds = tuple(sorted(cls.wind_thresholds.values()))
+        cls._visibility_bound_array = _bound_array(cls._visibility_bounds)
+        cls._precipitation_bound_array = _bound_array(cls._precipitation_bounds)
+        cls._wind_bound_array = _bound_array(cls._wind_bounds)
+    
+    def __init__(self, cache_size: int = 512):
+        """
+        Initialize weather risk assessment parameters.
+        cache_size: Number of distinct weather conditions whose assessments are kept
+        """
+        # Assessments keyed by exact weather values, least recently used first
+        self._assessment_cache: OrderedDict[tuple, Dict] = OrderedDict()
+        self._cache_size = cache_size
         
-    def assess_weather_risk(self, weather_data: WeatherData) -> Dict:
+    def assess_weather_risk(self, weather_data: Union[WeatherData, np.record]) -> WeatherRiskResult:
         """
         Assess weather-related risks and their impact on collision avoidance.
-        Returns a dictionary with risk assessment and recommendations.
+        Accepts a WeatherData instance or a WEATHER_DTYPE record.
+        Returns the risk assessment with recommendations; repeated weather
+        is served from a cache, so treat weather_data as read-only once assessed.
         """
-        # Calculate individual risk factors
-        visibility_risk = self._calculate_visibility_risk(weather_data.visibility)
-        precipitation_risk = self._calculate_precipitation_risk(weather_data.precipitation_rate)
-        wind_risk = self._calculate_wind_risk(weather_data.wind_speed)
+        # Steady weather is re-assessed every update; reuse the result for identical values
+        key = _weather_key(weather_data)
+        assessment = self._assessment_cache.get(key)
+        if assessment is None:
+            assessment = self._assess_weather_risk(weather_data)
+            self._assessment_cache[key] = assessment
+            if len(self._assessment_cache) > self._cache_size:
+                self._assessment_cache.popitem(last=False)
+        else:
+            self._assessment_cache.move_to_end(key)
+        return assessment
+    
+    def _assess_weather_risk(self, weather_data: Union[WeatherData, np.record]) -> WeatherRiskResult:
+        """Uncached assess_weather_risk."""
         turbulence_risk = weather_data.turbulence_index
         icing_risk = weather_data.icing_potential
         lightning_risk = weather_data.lightning_activity
         
-        # Calculate combined risk score
-        risk_factors = {
-            'visibility': visibility_risk,
-            'precipitation': precipitation_risk,
-            'wind': wind_risk,
-            'turbulence': turbulence_risk,
-            'icing': icing_risk,
-            'lightning': lightning_risk
-        }
-        
-        combined_risk = np.mean(list(risk_factors.values()))
+        # Score individual risk factors, combined risk and risk level in one compiled call;
+        # same bands as _calculate_*_risk and _determine_risk_level
+        combined_risk, level, visibility_risk, precipitation_risk, wind_risk = weather_risk(
+            weather_data.visibility, weather_data.precipitation_rate, weather_data.wind_speed,
+            turbulence_risk, icing_risk, lightning_risk, self._visibility_bound_array,
+            self._precipitation_bound_array, self._wind_bound_array
+        )
+        risk_level = RiskLevel(level)
+        risk_factors = (visibility_risk, precipitation_risk, wind_risk, turbulence_risk, icing_risk, lightning_risk)
         
-        # Determine overall risk level
-        risk_level = self._determine_risk_level(combined_risk)
+        return WeatherRiskResult(
+            risk_level,
+            combined_risk,
+            *risk_factors,
+            self._generate_recommendations(risk_factors, risk_level),
+            weather_data
+        )
+    
+    def assess_weather_risk_batch(self,
+                                  visibility: np.ndarray,
+                                  precipitation_rate: np.ndarray,
+                                  wind_speed: np.ndarray,
+                                  turbulence_index: np.ndarray,
+                                  icing_potential: np.ndarray,
+                                  lightning_activity: np.ndarray) -> Dict:
+        """
+        Assess weather risk for many samples at once, one 1-D array per weather field.
+        Returns a dictionary of per-sample arrays: risk_level (int8 RiskLevel values),
+        risk_score and a dictionary of risk_factors, all float32. Recommendations are
+        not built; use assess_weather_risk for a single sample's full report.
+        """
+        # Inputs are scored in double precision, so levels match assess_weather_risk;
+        # only the returned scores and factors are narrowed to float32
+        visibility = np.asarray(visibility, dtype=np.float64)
+        precipitation_rate = np.asarray(precipitation_rate, dtype=np.float64)
+        wind_speed = np.asarray(wind_speed, dtype=np.float64)
+        turbulence_risk = np.asarray(turbulence_index, dtype=np.float64)
+        icing_risk = np.asarray(icing_potential, dtype=np.float64)
+        lightning_risk = np.asarray(lightning_activity, dtype=np.float64)
         
-        # Generate recommendations
-        recommendations = self._generate_recommendations(risk_factors, risk_level)
+        if HAVE_NUMBA:
+            # Compiled scalar kernel per sample, in parallel
+            size = len(turbulence_risk)
+            combined_risk = np.empty(size, dtype=np.float32)
+            risk_level = np.empty(size, dtype=np.int8)
+            visibility_risk = np.empty(size, dtype=np.float32)
+            precipitation_risk = np.empty(size, dtype=np.float32)
+            wind_risk = np.empty(size, dtype=np.float32)
+            weather_risk_batch(
+                visibility, precipitation_rate, wind_speed,
+                turbulence_risk, icing_risk, lightning_risk,
+                self._visibility_bound_array, self._precipitation_bound_array, self._wind_bound_array,
+                combined_risk, risk_level, visibility_risk, precipitation_risk, wind_risk
+            )
+        else:
+            # Same threshold bands as the scalar lookups, one searchsorted per field
+            visibility_risk = _DESCENDING_SCORE_ARRAY[np.searchsorted(self._visibility_bound_array, visibility, side='right')]
+            precipitation_risk = _ASCENDING_SCORE_ARRAY[np.searchsorted(self._precipitation_bound_array, precipitation_rate, side='left')]
+            wind_risk = _ASCENDING_SCORE_ARRAY[np.searchsorted(self._wind_bound_array, wind_speed, side='left')]
+            
+            combined_risk = (visibility_risk + precipitation_risk + wind_risk +
+                             turbulence_risk + icing_risk + lightning_risk) / 6.0
+            risk_level = np.searchsorted(_RISK_LEVEL_BOUND_ARRAY, combined_risk, side='right').astype(np.int8)
+            combined_risk = combined_risk.astype(np.float32)
+            visibility_risk = visibility_risk.astype(np.float32)
+            precipitation_risk = precipitation_risk.astype(np.float32)
+            wind_risk = wind_risk.astype(np.float32)
+        turbulence_risk = turbulence_risk.astype(np.float32)
+        icing_risk = icing_risk.astype(np.float32)
+        lightning_risk = lightning_risk.astype(np.float32)
         
         return {
             'risk_level': risk_level,
             'risk_score': combined_risk,
-            'risk_factors': risk_factors,
-            'recommendations': recommendations,
-            'weather_conditions': {
-                'visibility': weather_data.visibility,
-                'precipitation': weather_data.precipitation_rate,
-                'wind_speed': weather_data.wind_speed,
-                'wind_direction': weather_data.wind_direction,
-                'cloud_ceiling': weather_data.cloud_ceiling
+            'risk_factors': {
+                'visibility': visibility_risk,
+                'precipitation': precipitation_risk,
+                'wind': wind_risk,
+                'turbulence': turbulence_risk,
+                'icing': icing_risk,
+                'lightning': lightning_risk
             }
         }
     
+    def assess_weather_data_batch(self, batch: WeatherDataBatch) -> Dict:
+        """assess_weather_risk_batch over the field columns of a WeatherDataBatch."""
+        data = batch.data
+        return self.assess_weather_risk_batch(
+            data['visibility'], data['precipitation_rate'], data['wind_speed'],
+            data['turbulence_index'], data['icing_potential'], data['lightning_activity']
+        )
+    
     def _calculate_visibility_risk(self, visibility: float) -> float:
         """Calculate risk factor based on visibility."""
-        if visibility < self.visibility_thresholds['critical']:
-            return 1.0
-        elif visibility < self.visibility_thresholds['high']:
-            return 0.8
-        elif visibility < self.visibility_thresholds['medium']:
-            return 0.6
-        elif visibility < self.visibility_thresholds['low']:
-            return 0.4
-        return 0.2
+        # Risk falls as visibility reaches each threshold
+        return _DESCENDING_SCORES[bisect_right(self._visibility_bounds, visibility)]
     
     def _calculate_precipitation_risk(self, precipitation: float) -> float:
         """Calculate risk factor based on precipitation rate."""
-        if precipitation > self.precipitation_thresholds['critical']:
-            return 1.0
-        elif precipitation > self.precipitation_thresholds['high']:
-            return 0.8
-        elif precipitation > self.precipitation_thresholds['medium']:
-            return 0.6
-        elif precipitation > self.precipitation_thresholds['low']:
-            return 0.4
-        return 0.2
+        # Risk rises as precipitation exceeds each threshold
+        return _ASCENDING_SCORES[bisect_left(self._precipitation_bounds, precipitation)]
     
     def _calculate_wind_risk(self, wind_speed: float) -> float:
         """Calculate risk factor based on wind speed."""
-        if wind_speed > self.wind_thresholds['critical']:
-            return 1.0
-        elif wind_speed > self.wind_thresholds['high']:
-            return 0.8
-        elif wind_speed > self.wind_thresholds['medium']:
-            return 0.6
-        elif wind_speed > self.wind_thresholds['low']:
-            return 0.4
-        return 0.2
+        # Risk rises as wind speed exceeds each threshold
+        return _ASCENDING_SCORES[bisect_left(self._wind_bounds, wind_speed)]
     
-    def _determine_risk_level(self, combined_risk: float) -> str:
+    def _determine_risk_level(self, combined_risk: float) -> RiskLevel:
         """Determine overall risk level based on combined risk score."""
-        if combined_risk >= 0.8:
-            return "CRITICAL"
-        elif combined_risk >= 0.6:
-            return "HIGH"
-        elif combined_risk >= 0.4:
-            return "MEDIUM"
-        elif combined_risk >= 0.2:
-            return "LOW"
-        return "NONE"
+        # Band index 0-4 is the RiskLevel value, NONE to CRITICAL
+        return RiskLevel(bisect_right(RISK_LEVEL_BOUNDS, combined_risk))
     
-    def _generate_recommendations(self, risk_factors: Dict[str, float], risk_level: str) -> List[str]:
-        """Generate specific recommendations based on risk factors and level."""
-        recommendations = []
-        
-        # Visibility-based recommendations
-        if risk_factors['visibility'] >= 0.8:
-            recommendations.append("Consider alternate routing due to low visibility")
-        elif risk_factors['visibility'] >= 0.6:
-            recommendations.append("Increase separation distances due to reduced visibility")
-        
-        # Precipitation-based recommendations
-        if risk_factors['precipitation'] >= 0.8:
-            recommendations.append("Activate weather radar and maintain increased separation")
-        elif risk_factors['precipitation'] >= 0.6:
-            recommendations.append("Monitor precipitation intensity and adjust speed accordingly")
-        
-        # Wind-based recommendations
-        if risk_factors['wind'] >= 0.8:
-            recommendations.append("Consider altitude change due to strong winds")
-        elif risk_factors['wind'] >= 0.6:
-            recommendations.append("Adjust speed and heading for wind compensation")
-        
-        # Turbulence-based recommendations
-        if risk_factors['turbulence'] >= 0.8:
-            recommendations.append("Activate turbulence mode and increase separation")
-        elif risk_factors['turbulence'] >= 0.6:
-            recommendations.append("Maintain increased separation in turbulent conditions")
-        
-        # Icing-based recommendations
-        if risk_factors['icing'] >= 0.8:
-            recommendations.append("Activate anti-ice systems and consider altitude change")
-        elif risk_factors['icing'] >= 0.6:
-            recommendations.append("Monitor icing conditions and activate anti-ice as needed")
-        
-        # Lightning-based recommendations
-        if risk_factors['lightning'] >= 0.8:
-            recommendations.append("Maintain maximum separation from storm cells")
-        elif risk_factors['lightning'] >= 0.6:
-            recommendations.append("Monitor lightning activity and adjust route if necessary")
-        
-        # General recommendations based on risk level
-        if risk_level == "CRITICAL":
-            recommendations.append("Consider immediate diversion or holding pattern")
-        elif risk_level == "HIGH":
-            recommendations.append("Increase situational awareness and prepare for possible diversion")
-        elif risk_level == "MEDIUM":
-            recommendations.append("Maintain increased vigilance and monitor weather conditions")
+    def _generate_recommendations(self, risk_factors: Sequence[float], risk_level: RiskLevel) -> Tuple[str, ...]:
+        """
+        Generate specific recommendations based on risk factors and level.
+        risk_factors: factor values in _FACTOR_RECOMMENDATIONS order
+        """
+        # One candidate per factor (None below the moderate band), then the risk level one
+        candidates = [
+            messages[bisect_right(_FACTOR_BAND_BOUNDS, value)]
+            for messages, value in zip(_FACTOR_RECOMMENDATIONS, risk_factors)
+        ]
+        candidates.append(_RISK_LEVEL_RECOMMENDATIONS.get(risk_level))
         
-        return recommendations 
\ No newline at end of file
+        return tuple(filter(None, candidates)) 
\ No newline at end of file
@@ -0,0 +1,67 @@
+import unittest
+from unittest import mock
+import paho.mqtt.client as mqtt
+from tcas.mqtt_server import MQTTConfig, TCASMQTTServer
+
+def _payload(identifier, lat, lon, heading=0, speed=250, altitude=10000):
+    return {
+        'transponder_data': {
+            'identifier': identifier,
+            'position': {'lat': lat, 'lon': lon},
+            'altitude': altitude,
+            'speed': speed,
+            'heading': heading
+        },
+        'radar_data': {},
+        'timestamp': 0
+    }
+
+class CollisionAlertTest(unittest.TestCase):
+    def _server(self, **config):
+        server = TCASMQTTServer(MQTTConfig(**config))
+        server.published = []
+        server._publish_alert = server.published.append
+        return server
+
+    def _update(self, server, *payloads):
+        for payload in payloads:
+            server._process_sensor_data(payload)
+
+    def test_only_pairs_with_updated_aircraft(self):
+        server = self._server(info_alerts=False)
+        # A and B in conflict, C far from both
+        self._update(server, _payload('A', 0, 0), _payload('B', 100, 0), _payload('C', 1e6, 1e6))
+        server.published.clear()
+        self._update(server, _payload('C', 1e6, 1e6))
+        self.assertEqual(server.published, [])
+        self._update(server, _payload('B', 100, 0))
+        self.assertEqual([alert['aircraft_ids'] for alert in server.published], [['A', 'B']])
+        self.assertEqual(server.published[0]['level'], 'RA')
+
+    def test_info_alerts(self):
+        server = self._server()
+        self._update(server, _payload('A', 0, 0), _payload('B', 100, 0))
+        server.published.clear()
+        self._update(server, _payload('C', 1e6, 1e6))
+        self.assertEqual(sorted(alert['aircraft_ids'] for alert in server.published), [['A', 'C'], ['B', 'C']])
+        self.assertTrue(all(alert['level'] == 'INFO' for alert in server.published))
+
+        server = self._server(info_alerts=False)
+        self._update(server, _payload('A', 0, 0), _payload('C', 1e6, 1e6))
+        self.assertEqual(server.published, [])
+
+class AlertPublishTest(unittest.TestCase):
+    def test_alert_carries_content_type(self):
+        for payload_format, content_type in (('json', 'application/json'), ('msgpack', 'application/msgpack')):
+            server = TCASMQTTServer(MQTTConfig(payload_format=payload_format))
+            server.connected = True
+            with mock.patch.object(server.client, 'publish') as publish:
+                publish.return_value.rc = mqtt.MQTT_ERR_SUCCESS
+                server._publish_alert({'level': 'RA', 'message': 'test'})
+            properties = publish.call_args.kwargs['properties']
+            self.assertEqual(properties.ContentType, content_type)
+            self.assertEqual(publish.call_args.kwargs['qos'], 2)
+            properties.pack()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,67 @@
+import unittest
+import numpy as np
+from tcas import EnhancedTCAS, RiskLevel
+
+def _sensor_data(position, altitude, speed, heading, visual):
+    return {
+        'transponder': {'position': position, 'altitude': altitude, 'speed': speed, 'heading': heading},
+        'radar': {'range': 5000, 'bearing': 45, 'relative_velocity': 0},
+        'visual': visual,
+        'timestamp': '2024-03-20T10:00:00Z'
+    }
+
+class ProcessUpdateTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.tcas = EnhancedTCAS()
+        rng = np.random.default_rng(0)
+        cls.uint8_frame = rng.integers(0, 256, (224, 224, 3), dtype=np.uint8)
+        cls.float_frame = rng.random((224, 224, 3), dtype=np.float32)
+
+    def _check_object_info(self, info):
+        self.assertIsInstance(info['basic_info']['type'], str)
+        self.assertGreaterEqual(info['basic_info']['confidence'], 0.0)
+        self.assertEqual(set(info['detailed_classification']),
+                         {'main_category', 'subcategory', 'specific_type'})
+        for type_info in info['possible_types']:
+            self.assertEqual(set(type_info), {'type', 'confidence'})
+        self.assertIn('size', info['additional_features'])
+
+    def test_full_pipeline(self):
+        result = self.tcas.process_update(
+            _sensor_data({'lat': 0, 'lon': 0}, 10000, 250, 90, self.uint8_frame),
+            _sensor_data({'lat': 5000, 'lon': 5000}, 9500, 220, 270, self.float_frame),
+            weather_data={'visibility': 5000, 'precipitation_rate': 2.5, 'wind_speed': 25},
+            terrain_data={'aircraft_altitude': 10000, 'terrain_elevation': 8000,
+                          'terrain_obstacles': [{'distance': 3000, 'height': 200}]}
+        )
+        self._check_object_info(result['ownship'])
+        self._check_object_info(result['intruder'])
+        self.assertIsInstance(result['risk_assessment']['risk_level'], RiskLevel)
+        self.assertIsNotNone(result['weather_assessment'])
+        self.assertIsNotNone(result['terrain_assessment'])
+        self.assertIn(result['alerts'][0]['level'], ('RA', 'TA', 'ADVISORY', 'INFO'))
+        self.assertEqual(result['timestamp'], '2024-03-20T10:00:00Z')
+
+    def test_conflicting_pair_shares_frame(self):
+        result = self.tcas.process_update(
+            _sensor_data({'lat': 0, 'lon': 0}, 10000, 250, 0, self.uint8_frame),
+            _sensor_data({'lat': 100, 'lon': 0}, 10000, 250, 0, self.uint8_frame)
+        )
+        self._check_object_info(result['ownship'])
+        self.assertEqual(result['risk_assessment']['risk_level'], RiskLevel.CRITICAL)
+        self.assertEqual(result['alerts'][0]['level'], 'RA')
+
+    def test_clear_of_conflict(self):
+        result = self.tcas.process_update(
+            _sensor_data({'lat': 0, 'lon': 0}, 10000, 250, 90, self.uint8_frame),
+            _sensor_data({'lat': 1e7, 'lon': 1e7}, 10000, 250, 270, self.uint8_frame)
+        )
+        self.assertIsNone(result['ownship'])
+        self.assertIsNone(result['intruder'])
+        self.assertEqual(result['risk_assessment']['risk_level'], RiskLevel.NONE)
+        self.assertGreater(result['risk_assessment']['min_separation'], 2000)
+        self.assertEqual(result['alerts'][0]['level'], 'INFO')
+
+if __name__ == '__main__':
+    unittest.main()
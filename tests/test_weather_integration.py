@@ -0,0 +1,95 @@
+import itertools
+import unittest
+from types import MappingProxyType
+from unittest import mock
+import numpy as np
+from tcas import weather_integration
+from tcas.weather_integration import RiskLevel, WeatherData, WeatherRiskAssessor, weather_record
+
+def _reference_band(value, thresholds, descending):
+    """Generic per-factor score: the original if/elif chain over the threshold dict."""
+    for name, score in (('critical', 1.0), ('high', 0.8), ('medium', 0.6), ('low', 0.4)):
+        if (value < thresholds[name]) if descending else (value > thresholds[name]):
+            return score
+    return 0.2
+
+def _reference_assessment(assessor, weather):
+    """Generic (risk_level, risk_score) of an assessor's thresholds, scored with np.mean."""
+    combined_risk = np.mean([
+        _reference_band(weather.visibility, assessor.visibility_thresholds, True),
+        _reference_band(weather.precipitation_rate, assessor.precipitation_thresholds, False),
+        _reference_band(weather.wind_speed, assessor.wind_thresholds, False),
+        weather.turbulence_index,
+        weather.icing_potential,
+        weather.lightning_activity
+    ])
+    return RiskLevel(sum(combined_risk >= bound for bound in (0.2, 0.4, 0.6, 0.8))), combined_risk
+
+def _boundary_grid(assessor):
+    """Weather on, just below and just above every threshold, with factor values hitting the level bounds."""
+    def around(thresholds):
+        values = sorted(thresholds.values())
+        return [0.0] + [v + d for v in values for d in (-0.25, 0.0, 0.25)] + [values[-1] * 2]
+    factors = (0.0, 0.1, 0.2, 0.3, 0.4, 0.6, 0.8, 1.0)
+    return [
+        WeatherData(visibility, precipitation, 8000, wind, 0, turbulence, icing, lightning)
+        for visibility, precipitation, wind, turbulence, icing, lightning in itertools.product(
+            around(assessor.visibility_thresholds), around(assessor.precipitation_thresholds),
+            around(assessor.wind_thresholds), factors, factors[::3], factors[::2]
+        )
+    ]
+
+class StrictWeatherRiskAssessor(WeatherRiskAssessor):
+    visibility_thresholds = MappingProxyType({'critical': 2000, 'high': 4000, 'medium': 6000, 'low': 9000})
+    wind_thresholds = MappingProxyType({'critical': 40, 'high': 30, 'medium': 20, 'low': 10})
+
+class WeatherRiskAssessorTest(unittest.TestCase):
+    def _assert_matches_reference(self, assessor):
+        for weather in _boundary_grid(assessor):
+            result = assessor.assess_weather_risk(weather)
+            level, score = _reference_assessment(assessor, weather)
+            self.assertEqual((result.risk_level, result.risk_score), (level, score), weather)
+
+    def _assert_batch_matches_scalar(self, assessor):
+        grid = _boundary_grid(assessor)
+        columns = np.array(grid, dtype=float).T
+        arguments = (columns[0], columns[1], columns[3], columns[5], columns[6], columns[7])
+        expected = [assessor.assess_weather_risk(weather) for weather in grid]
+        for have_numba in sorted({weather_integration.HAVE_NUMBA, False}):
+            with mock.patch.object(weather_integration, 'HAVE_NUMBA', have_numba):
+                batch = assessor.assess_weather_risk_batch(*arguments)
+            np.testing.assert_array_equal(batch['risk_level'], [result.risk_level for result in expected])
+            np.testing.assert_allclose(batch['risk_score'], [result.risk_score for result in expected], rtol=1e-6)
+            self.assertEqual(batch['risk_score'].dtype, np.float32)
+
+    def test_matches_reference_at_band_boundaries(self):
+        self._assert_matches_reference(WeatherRiskAssessor())
+
+    def test_batch_and_fallback_match_scalar(self):
+        self._assert_batch_matches_scalar(WeatherRiskAssessor())
+
+    def test_record_matches_weather_data(self):
+        assessor = WeatherRiskAssessor()
+        for weather in _boundary_grid(assessor)[::7]:
+            record = weather_record(weather._asdict())
+            self.assertEqual(assessor.assess_weather_risk(record).risk_level,
+                             assessor.assess_weather_risk(weather).risk_level)
+
+    def test_subclass_rebuilds_bounds(self):
+        self.assertEqual(StrictWeatherRiskAssessor._visibility_bounds, (2000, 4000, 6000, 9000))
+        self.assertEqual(StrictWeatherRiskAssessor._wind_bound_array.tolist(), [10, 20, 30, 40])
+        self.assertEqual(StrictWeatherRiskAssessor._precipitation_bounds, WeatherRiskAssessor._precipitation_bounds)
+        self.assertEqual(WeatherRiskAssessor._visibility_bounds, (1000, 3000, 5000, 8000))
+        self._assert_matches_reference(StrictWeatherRiskAssessor())
+        self._assert_batch_matches_scalar(StrictWeatherRiskAssessor())
+
+    def test_combined_score_rounds_like_mean(self):
+        # 1+1+1+0+0.3+0.3 scaled by (1/6) rounds to 0.5999...; np.mean gives 0.6, HIGH
+        assessor = WeatherRiskAssessor()
+        weather = WeatherData(500, 20, 8000, 60, 0, 0.0, 0.3, 0.3)
+        self.assertEqual(assessor.assess_weather_risk(weather).risk_level, RiskLevel.HIGH)
+        batch = assessor.assess_weather_risk_batch(*([value] for value in (500, 20, 60, 0.0, 0.3, 0.3)))
+        self.assertEqual(batch['risk_level'][0], RiskLevel.HIGH)
+
+if __name__ == '__main__':
+    unittest.main()